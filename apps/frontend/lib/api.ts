@@ -11,6 +11,7 @@ export interface HealthScoreResponse {
     ltv_ratio: number
     originator_reputation: number
     market_conditions: number
+    concentration_risk?: number
   }
   timestamp: string
 }
@@ -92,6 +93,35 @@ export const heliosAPI = {
       console.error('Error fetching monitored vaults:', error)
       return []
     }
+  },
+
+  // Subscribe to live health score updates (all vaults if none given); returns an unsubscribe function
+  subscribeHealthScores(
+    onUpdate: (update: HealthScoreResponse) => void,
+    vaultIds?: number[]
+  ): () => void {
+    const query = vaultIds && vaultIds.length ? `?vaults=${vaultIds.join(',')}` : ''
+    let source: EventSource | null = null
+    let retry: ReturnType<typeof setTimeout> | null = null
+    let closed = false
+    const open = () => {
+      source = new EventSource(`${HELIOS_API_URL}/api/v1/stream/health${query}`)
+      source.addEventListener('health', (event) => {
+        onUpdate(JSON.parse((event as MessageEvent).data))
+      })
+      // The agent drops subscribers that fall behind; EventSource won't reconnect after a
+      // clean close, so open a fresh stream ourselves
+      source.addEventListener('evicted', () => {
+        source?.close()
+        if (!closed) retry = setTimeout(open, 5000)
+      })
+    }
+    open()
+    return () => {
+      closed = true
+      if (retry) clearTimeout(retry)
+      source?.close()
+    }
   }
 }
 
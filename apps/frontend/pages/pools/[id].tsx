@@ -29,6 +29,14 @@ export default function PoolDetail() {
     }
   }, [id])
 
+  // Live updates from Helios instead of re-fetching the score
+  useEffect(() => {
+    if (!id) return
+    return api.helios.subscribeHealthScores((update) => {
+      setAiHealthScore(update.score)
+    }, [Number(id)])
+  }, [id])
+
   const fetchPoolData = async () => {
     setLoading(true)
     try {
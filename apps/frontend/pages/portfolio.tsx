@@ -4,6 +4,7 @@ import { TrendingUp, DollarSign, Shield, AlertTriangle, Clock, BarChart3, ArrowU
 import { useRouter } from 'next/router'
 import { HealthScoreGauge, WaterfallVisualizer } from '../components/UIComponents'
 import { poolsData } from '../lib/poolsData'
+import { api } from '../lib/api'
 
 interface Investment {
   poolId: number
@@ -45,6 +46,10 @@ export default function Portfolio() {
   useEffect(() => {
     fetchPortfolioData()
     fetchAIHealthScore()
+    // Live updates from Helios instead of re-fetching the score
+    return api.helios.subscribeHealthScores((update) => {
+      setAiHealthScore(update.score)
+    }, [1])
   }, [])
 
   const fetchPortfolioData = async () => {
@@ -0,0 +1,83 @@
+"""
+Compare two benchmark result files produced by run_bench.py
+
+    python bench/compare.py bench/results/<baseline>.json bench/results/<candidate>.json
+
+Prints per-scenario throughput and p50/p95/p99 deltas; exits 1 if any metric
+regresses by more than --threshold percent.
+"""
+
+import sys
+import json
+import argparse
+from typing import Dict, Iterator, Optional, Tuple
+
+# metric name -> True when higher is better
+METRICS = {
+    "throughput_rps": True,
+    "throughput_vaults_per_s": True,
+    "latency_ms.p50": False,
+    "latency_ms.p95": False,
+    "latency_ms.p99": False,
+}
+
+
+def _get(run: Dict, dotted: str) -> Optional[float]:
+    value = run
+    for part in dotted.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def _runs(results: Dict) -> Iterator[Tuple[str, Dict]]:
+    for name, runs in results.get("http", {}).items():
+        for run in runs:
+            yield f"http.{name}@c{run.get('concurrency')}", run
+    for size, run in results.get("modeling", {}).items():
+        yield f"modeling@{size}", run
+    # Startup timings compare like latencies (lower is better)
+    for name, seconds in results.get("startup", {}).items():
+        yield f"startup.{name}", {"latency_ms": {"p50": seconds * 1000}}
+
+
+def compare(baseline: Dict, candidate: Dict, threshold: float) -> int:
+    base_runs = dict(_runs(baseline))
+    regressions = 0
+    print(f"{'scenario':32} {'metric':24} {'baseline':>12} {'candidate':>12} {'delta':>9}")
+    for key, run in _runs(candidate):
+        base = base_runs.get(key)
+        if base is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = _get(base, metric), _get(run, metric)
+            if old is None or new is None or old == 0:
+                continue
+            delta = (new - old) / old * 100
+            worse = -delta if higher_is_better else delta
+            flag = ""
+            if worse > threshold:
+                regressions += 1
+                flag = "  REGRESSION"
+            print(f"{key:32} {metric:24} {old:12.3f} {new:12.3f} {delta:+8.1f}%{flag}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare two Helios benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed regression in percent")
+    args = parser.parse_args()
+    with open(args.baseline) as fh:
+        baseline = json.load(fh)
+    with open(args.candidate) as fh:
+        candidate = json.load(fh)
+    regressions = compare(baseline, candidate, args.threshold)
+    print(f"\n{regressions} regression(s) beyond {args.threshold:.0f}%")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""
+Local stand-ins for the Aptos fullnode REST API and the Nodit indexer
+Used by the benchmark suite so the assess pipeline can be measured without live testnet.
+Latency, jitter, 5xx errors and 429 throttling are injectable per server.
+"""
+
+import json
+import random
+import re
+from urllib.parse import parse_qs, urlsplit
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+MODULE_ADDRESS = "0x" + "ab" * 32
+
+ASSET_TYPES = ["invoice_financing", "real_estate_bridge", "trade_finance", "equipment_lease", "consumer_credit"]
+ORIGINATORS = ["0x" + f"{i:02x}" * 32 for i in range(1, 25)]
+
+
+@dataclass
+class FaultConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: float = 0.5
+
+
+def owner_for_vault(vault_id: int) -> str:
+    """Each benchmark vault lives at its own synthetic owner account"""
+    return f"0x{vault_id:064x}"
+
+
+def vault_for_owner(address: str) -> int:
+    try:
+        return int(address, 16)
+    except ValueError:
+        return 0
+
+
+def vault_resources(vault_id: int) -> list:
+    """Account resources shaped like the StrataFi Move modules emit them"""
+    rng = random.Random(vault_id)
+    assets = []
+    total = 0
+    for i in range(rng.randint(1, 8)):
+        value = rng.randint(100_000, 5_000_000)
+        total += value
+        assets.append({
+            "id": str(i + 1),
+            "value": str(value),
+            "asset_type": rng.choice(ASSET_TYPES),
+            "originator": rng.choice(ORIGINATORS),
+        })
+    return [
+        {
+            "type": f"{MODULE_ADDRESS}::vault::Vault",
+            "data": {"id": str(vault_id), "total_value": str(total), "assets": assets, "created_ts": "1700000000"},
+        },
+        {
+            "type": f"{MODULE_ADDRESS}::tranche::TrancheVault",
+            "data": {"vault_id": str(vault_id), "senior_supply": "3000000", "mezz_supply": "1500000", "junior_supply": "500000"},
+        },
+    ]
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server: "StubServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def _send(self, status: int, body: Any, headers: Optional[dict] = None) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _inject_faults(self) -> bool:
+        """Apply latency and maybe answer with an injected error; True if the request was consumed"""
+        faults = self.server.faults
+        delay = faults.latency_ms + random.uniform(-faults.jitter_ms, faults.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        roll = random.random()
+        if roll < faults.throttle_rate:
+            self.server.count("throttled")
+            self._send(429, {"message": "rate limited"}, {"Retry-After": str(faults.retry_after)})
+            return True
+        if roll < faults.throttle_rate + faults.error_rate:
+            self.server.count("errors")
+            self._send(503, {"message": "injected failure"})
+            return True
+        return False
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def do_GET(self) -> None:
+        self.server.count("requests")
+        if self._inject_faults():
+            return
+        status, body = self.server.route("GET", self.path)
+        self._send(status, body)
+
+    def do_POST(self) -> None:
+        self.server.count("requests")
+        self._read_body()
+        if self._inject_faults():
+            return
+        status, body = self.server.route("POST", self.path)
+        self._send(status, body)
+
+
+class StubServer(ThreadingHTTPServer):
+    """Threaded HTTP stub; subclasses implement route()"""
+
+    daemon_threads = True
+
+    def __init__(self, faults: Optional[FaultConfig] = None, port: int = 0):
+        super().__init__(("127.0.0.1", port), _StubHandler)
+        self.faults = faults or FaultConfig()
+        self.counters = {"requests": 0, "errors": 0, "throttled": 0}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}/v1"
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.counters[key] += 1
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def route(self, method: str, path: str) -> Tuple[int, Any]:
+        raise NotImplementedError
+
+
+class FullnodeStub(StubServer):
+    """Subset of the Aptos fullnode REST API touched by the agent"""
+
+    _resources = re.compile(r"^/v1/accounts/(0x[0-9a-fA-F]+)/resources")
+    _resource = re.compile(r"^/v1/accounts/(0x[0-9a-fA-F]+)/resource/([^?]+)")
+    _events = re.compile(r"^/v1/accounts/(0x[0-9a-fA-F]+)/events/")
+    _tx_by_hash = re.compile(r"^/v1/transactions/(?:by_hash|wait_by_hash)/(0x[0-9a-fA-F]+)")
+
+    def __init__(self, faults: Optional[FaultConfig] = None, port: int = 0):
+        super().__init__(faults, port)
+        # Committed transactions served by GET /transactions, ordered by "version"
+        self.transactions: List[Dict[str, Any]] = []
+        self.ledger_version = 1000
+
+    def route(self, method: str, path: str) -> Tuple[int, Any]:
+        if path.rstrip("/") in ("/v1", "/v1/") or path.startswith("/v1/?"):
+            return 200, {"chain_id": 2, "ledger_version": str(self.ledger_version),
+                         "ledger_timestamp": str(int(time.time() * 1e6))}
+        if method == "GET" and urlsplit(path).path.rstrip("/") == "/v1/transactions":
+            query = parse_qs(urlsplit(path).query)
+            start = int(query.get("start", ["0"])[0])
+            limit = int(query.get("limit", ["25"])[0])
+            return 200, [t for t in self.transactions if int(t["version"]) >= start][:limit]
+        match = self._resources.match(path)
+        if match:
+            return 200, vault_resources(vault_for_owner(match.group(1)))
+        match = self._resource.match(path)
+        if match:
+            vault_id = vault_for_owner(match.group(1))
+            if match.group(2).endswith("::risk_oracle::HealthScore"):
+                return 200, {"type": match.group(2), "data": {
+                    "vault_id": str(vault_id), "current": "60",
+                    "risk_factors": {"asset_diversity": "60", "ltv_ratio": "85",
+                                     "originator_reputation": "75", "market_conditions": "60"},
+                }}
+            return 404, {"error_code": "resource_not_found"}
+        if self._events.match(path):
+            return 200, []
+        match = self._tx_by_hash.match(path)
+        if match:
+            return 200, {"hash": match.group(1), "type": "user_transaction", "success": True, "gas_used": "12"}
+        if method == "POST" and path.startswith("/v1/transactions"):
+            return 202, {"hash": "0x" + "00" * 32}
+        return 404, {"error_code": "not_found"}
+
+
+class NoditStub(StubServer):
+    """Nodit indexer events endpoint"""
+
+    _events = re.compile(r"^/v1/accounts/(0x[0-9a-fA-F]+)/events")
+
+    def route(self, method: str, path: str) -> Tuple[int, Any]:
+        if path.startswith("/v1/accounts/0x1") and not self._events.match(path):
+            return 200, {"address": "0x1"}
+        match = self._events.match(path)
+        if match:
+            vault_id = vault_for_owner(match.group(1))
+            return 200, {"data": [
+                {"type": f"{MODULE_ADDRESS}::vault::VaultCreatedEvent", "data": {"id": str(vault_id)}},
+                {"type": f"{MODULE_ADDRESS}::vault::RWAAddedEvent", "data": {"vault_id": str(vault_id), "value": "1000000"}},
+            ]}
+        return 404, {"message": "not found"}
@@ -1,6 +1,6 @@
 import os
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, DateTime, Text
+from sqlalchemy import create_engine, Column, Integer, BigInteger, DateTime, Text, String, UniqueConstraint
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import declarative_base, sessionmaker, Session
 from dotenv import load_dotenv
@@ -22,6 +22,48 @@ class HealthScoreModel(Base):
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
 
 
+class HealthScoreHistoryModel(Base):
+    """Every stored assessment, append-only (agent_health_scores keeps only the latest)"""
+    __tablename__ = "agent_health_score_history"
+    id = Column(Integer, primary_key=True, index=True)
+    vault_id = Column(Integer, index=True, nullable=False)
+    score = Column(Integer, nullable=False)
+    risk_factors = Column(JSONB)
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True, nullable=False)
+
+
+class VaultRegistryModel(Base):
+    """Owner address for each assessed vault (event handles and oracle state live at the owner)"""
+    __tablename__ = "agent_vaults"
+    id = Column(Integer, primary_key=True, index=True)
+    vault_id = Column(Integer, unique=True, index=True, nullable=False)
+    owner_address = Column(String(66), index=True, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class VaultHoldingsModel(Base):
+    """Latest normalized composition of each assessed vault, so every worker's exposure index
+    can be rebuilt with the whole fleet (assets: [{originator, asset_type, value}, ...])"""
+    __tablename__ = "agent_vault_holdings"
+    id = Column(Integer, primary_key=True, index=True)
+    vault_id = Column(Integer, unique=True, index=True, nullable=False)
+    owner_address = Column(String(66), nullable=False)
+    assets = Column(JSONB, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, index=True, nullable=False)
+
+
+class EventCursorModel(Base):
+    """Resume point for on-chain tailing (the trigger pipeline keeps its next ledger version here)"""
+    __tablename__ = "agent_event_cursors"
+    __table_args__ = (UniqueConstraint("account_address", "event_handle", "field_name"),)
+    id = Column(Integer, primary_key=True, index=True)
+    account_address = Column(String(66), nullable=False)
+    event_handle = Column(Text, nullable=False)
+    field_name = Column(String(64), nullable=False)
+    next_sequence = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
 def init_db() -> None:
     Base.metadata.create_all(bind=engine)
 
@@ -0,0 +1,250 @@
+"""
+Fullnode endpoint pool for Helios Risk Oracle
+Routes reads to the best-scoring Aptos fullnode, hedges slow reads to a second node,
+and ejects failing nodes behind a circuit breaker until a probe succeeds.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin
+
+from dotenv import load_dotenv
+
+from ratelimit import UpstreamLimiter
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NODE_URL = "https://fullnode.testnet.aptoslabs.com/v1"
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+
+
+class FullnodeEndpoint:
+    """A single fullnode with rolling latency/error statistics and a circuit breaker"""
+
+    def __init__(self, url: str, limiter: UpstreamLimiter, window: int = 200):
+        self.url = url.rstrip('/')
+        self.limiter = limiter
+        self._latencies: deque = deque(maxlen=window)
+        self.error_rate = 0.0  # EWMA of failures, 0..1
+        self.consecutive_failures = 0
+        self.state = CIRCUIT_CLOSED
+        self.opened_at = 0.0
+        self.probing = False
+
+    def record(self, latency: float, ok: bool) -> None:
+        if ok:
+            self._latencies.append(latency)
+            self.consecutive_failures = 0
+        else:
+            self.consecutive_failures += 1
+        self.error_rate = 0.9 * self.error_rate + (0.0 if ok else 0.1)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def score(self) -> float:
+        """Lower is better: median latency inflated by error rate and current load"""
+        p50 = self.percentile(0.5)
+        base = p50 if p50 is not None else 0.2
+        return base * (1.0 + 4.0 * self.error_rate) * (1.0 + 0.1 * self.limiter.in_flight)
+
+    def status(self) -> Dict[str, Any]:
+        p50 = self.percentile(0.5)
+        p95 = self.percentile(0.95)
+        return {
+            "url": self.url,
+            "state": self.state,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "concurrency_limit": self.limiter.concurrency_limit,
+        }
+
+
+class FullnodePool:
+    """Health-scored set of fullnodes with hedged reads and failover"""
+
+    def __init__(
+        self,
+        urls: List[str],
+        failure_threshold: int = 5,
+        open_seconds: float = 15.0,
+        default_hedge_delay: float = 0.5,
+        min_hedge_delay: float = 0.05,
+    ):
+        if not urls:
+            urls = [DEFAULT_NODE_URL]
+        self.endpoints: List[FullnodeEndpoint] = []
+        for url in urls:
+            limiter = UpstreamLimiter.from_env("FULLNODE", rate=20)
+            limiter.name = f"fullnode {url}"
+            self.endpoints.append(FullnodeEndpoint(url, limiter))
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.default_hedge_delay = default_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.hedges_total = 0
+
+    @classmethod
+    def from_env(cls) -> "FullnodePool":
+        """APTOS_NODE_URLS (comma separated) takes precedence over APTOS_NODE_URL"""
+        urls = [u.strip() for u in os.getenv("APTOS_NODE_URLS", "").split(",") if u.strip()]
+        if not urls:
+            urls = [os.getenv("APTOS_NODE_URL", DEFAULT_NODE_URL)]
+        return cls(
+            urls,
+            failure_threshold=int(os.getenv("FULLNODE_FAILURE_THRESHOLD", 5)),
+            open_seconds=float(os.getenv("FULLNODE_EJECT_SECONDS", 15)),
+        )
+
+    def ranked(self) -> List[FullnodeEndpoint]:
+        """Admitted endpoints ordered best first; schedules probes for ejected ones"""
+        now = time.monotonic()
+        healthy = []
+        for ep in self.endpoints:
+            if ep.state == CIRCUIT_CLOSED:
+                healthy.append(ep)
+            elif not ep.probing and now - ep.opened_at >= self.open_seconds:
+                self._start_probe(ep)
+        if not healthy:
+            # Everything is ejected: fail open on the least recently ejected nodes
+            return sorted(self.endpoints, key=lambda ep: ep.opened_at)
+        return sorted(healthy, key=lambda ep: ep.score())
+
+    def best_url(self) -> str:
+        return self.ranked()[0].url
+
+    def preferred_url(self, current: str, switch_ratio: float = 2.0) -> str:
+        """best_url() with hysteresis for long-lived clients: keep `current` while it is
+        admitted and its score is within switch_ratio of the best endpoint's"""
+        ranked = self.ranked()
+        best = ranked[0]
+        for ep in ranked:
+            if ep.url == current.rstrip('/'):
+                if ep.state == CIRCUIT_CLOSED and ep.score() <= switch_ratio * best.score():
+                    return ep.url
+                break
+        return best.url
+
+    def _start_probe(self, ep: FullnodeEndpoint) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        ep.probing = True
+        loop.create_task(self._probe(ep))
+
+    async def _probe(self, ep: FullnodeEndpoint) -> None:
+        """Re-admit an ejected node only after a ledger-info request succeeds"""
+        try:
+            start = time.monotonic()
+            resp = await ep.limiter.request("GET", ep.url + '/', max_retries=0, timeout=5)
+            ok = resp.status_code < 400
+            ep.record(time.monotonic() - start, ok)
+            if ok:
+                ep.state = CIRCUIT_CLOSED
+                ep.consecutive_failures = 0
+                logger.info(f"Fullnode {ep.url} re-admitted after successful probe")
+            else:
+                ep.opened_at = time.monotonic()
+        except Exception:
+            ep.opened_at = time.monotonic()
+        finally:
+            ep.probing = False
+
+    def _on_result(self, ep: FullnodeEndpoint, latency: float, ok: bool) -> None:
+        ep.record(latency, ok)
+        if not ok and ep.state == CIRCUIT_CLOSED and ep.consecutive_failures >= self.failure_threshold:
+            ep.state = CIRCUIT_OPEN
+            ep.opened_at = time.monotonic()
+            logger.warning(f"Fullnode {ep.url} ejected after {ep.consecutive_failures} consecutive failures")
+
+    async def _attempt(self, ep: FullnodeEndpoint, path: str, params: Optional[Dict[str, Any]], timeout: float) -> Any:
+        url = urljoin(ep.url + '/', path.lstrip('/'))
+        # With more than one node, failing over beats retrying the same one
+        retries = 0 if len(self.endpoints) > 1 else None
+        start = time.monotonic()
+        try:
+            resp = await ep.limiter.request("GET", url, max_retries=retries, params=params, timeout=timeout)
+        except Exception:
+            self._on_result(ep, time.monotonic() - start, False)
+            raise
+        # 4xx (e.g. resource not found) is an answer, not a node failure
+        self._on_result(ep, time.monotonic() - start, resp.status_code < 500 and resp.status_code != 429)
+        resp.raise_for_status()
+        return resp.json()
+
+    def _hedge_delay(self, ep: FullnodeEndpoint) -> float:
+        p95 = ep.percentile(0.95)
+        if p95 is None:
+            return self.default_hedge_delay
+        return max(self.min_hedge_delay, p95)
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None, timeout: float = 10) -> Any:
+        """
+        GET a fullnode REST path from the best endpoint.
+        If it is still pending past that endpoint's p95 latency, a duplicate goes to the
+        runner-up and the first successful answer wins. Errors fail over to the next node.
+        """
+        ranked = self.ranked()
+        primary = asyncio.ensure_future(self._attempt(ranked[0], path, params, timeout))
+        if len(ranked) < 2:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=self._hedge_delay(ranked[0]))
+        if primary in done:
+            if primary.exception() is None or _is_client_error(primary.exception()):
+                return primary.result()
+            # Fast failure: fail over to the runner-up instead of hedging
+            return await self._attempt(ranked[1], path, params, timeout)
+
+        self.hedges_total += 1
+        hedge = asyncio.ensure_future(self._attempt(ranked[1], path, params, timeout))
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None or _is_client_error(task.exception()):
+                    # Let the loser finish in the background so its latency is still recorded
+                    for other in pending:
+                        other.add_done_callback(_discard_result)
+                    return task.result()
+                error = task.exception()
+        raise error
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [ep.status() for ep in self.endpoints]
+
+
+def _is_client_error(exc: BaseException) -> bool:
+    """4xx responses are authoritative answers (e.g. resource not found), not node failures"""
+    response = getattr(exc, "response", None)
+    return response is not None and 400 <= response.status_code < 500 and response.status_code != 429
+
+
+def _discard_result(task: asyncio.Future) -> None:
+    if not task.cancelled():
+        task.exception()
+
+
+_pool: Optional[FullnodePool] = None
+
+
+def get_fullnode_pool() -> FullnodePool:
+    """Process-wide pool shared by ingestion, the publisher and status checks"""
+    global _pool
+    if _pool is None:
+        _pool = FullnodePool.from_env()
+    return _pool
@@ -0,0 +1,222 @@
+"""
+Columnar export of the Helios score book
+Streams the current scores (or the full assessment history) out of Postgres through a
+server-side cursor, converts each chunk to an Arrow record batch with one typed column per
+risk factor the model produces (modeling.RISK_FACTORS), and writes Arrow IPC or Parquet incrementally. Memory use is bounded by the
+chunk size regardless of fleet size.
+
+CLI:
+    python export.py --format parquet --output scores.parquet
+    python export.py --format arrow --history --since 2025-01-01 --output history.arrows
+"""
+
+import sys
+import queue
+import logging
+import argparse
+import threading
+from datetime import datetime
+from typing import Iterator, Optional
+
+from sqlalchemy import select
+
+from db import engine, HealthScoreModel, HealthScoreHistoryModel
+from modeling import RISK_FACTORS
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+DEFAULT_CHUNK_SIZE = 10000
+
+
+class ExportUnavailable(Exception):
+    """Raised when pyarrow is not installed"""
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ExportUnavailable("Columnar export requires pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+
+def score_schema(history: bool = False):
+    pa = _pyarrow()
+    fields = [pa.field("vault_id", pa.int32(), nullable=False), pa.field("score", pa.int16(), nullable=False)]
+    fields += [pa.field(name, pa.int16()) for name in RISK_FACTORS]
+    fields.append(pa.field("timestamp", pa.timestamp("us"), nullable=False))
+    metadata = {"helios.table": "history" if history else "current"}
+    return pa.schema(fields, metadata=metadata)
+
+
+def _factor(risk_factors, name: str) -> Optional[int]:
+    value = (risk_factors or {}).get(name)
+    try:
+        return None if value is None else int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_batches(history: bool = False, since: Optional[datetime] = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Yield Arrow record batches of at most chunk_size rows, read with a server-side cursor"""
+    pa = _pyarrow()
+    schema = score_schema(history)
+    model = HealthScoreHistoryModel if history else HealthScoreModel
+    stmt = select(model.vault_id, model.score, model.risk_factors, model.timestamp)
+    if since is not None:
+        stmt = stmt.where(model.timestamp >= since)
+    stmt = stmt.order_by(model.timestamp, model.id) if history else stmt.order_by(model.vault_id)
+
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(stmt)
+        for rows in result.partitions():
+            columns = [
+                [row[0] for row in rows],
+                [row[1] for row in rows],
+            ]
+            columns += [[_factor(row[2], name) for row in rows] for name in RISK_FACTORS]
+            columns.append([row[3] for row in rows])
+            yield pa.RecordBatch.from_arrays(
+                [pa.array(col, type=field.type) for col, field in zip(columns, schema)],
+                schema=schema,
+            )
+
+
+def write_export(sink, fmt: str = "arrow", history: bool = False, since: Optional[datetime] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Write the export to a binary file-like sink; returns the number of rows written"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(FORMATS)}")
+    pa = _pyarrow()
+    schema = score_schema(history)
+    if fmt == "parquet":
+        writer = pa.parquet.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+    rows = 0
+    try:
+        for batch in iter_batches(history, since, chunk_size):
+            if fmt == "parquet":
+                writer.write_batch(batch, row_group_size=chunk_size)
+            else:
+                writer.write_batch(batch)
+            rows += batch.num_rows
+    finally:
+        writer.close()
+    return rows
+
+
+class _QueueSink:
+    """Write-only file object handing bytes to a bounded queue (blocks when the reader lags)"""
+
+    def __init__(self, maxsize: int = 8):
+        self.queue: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=maxsize)
+        self.closed = False
+        self._position = 0
+        self.cancelled = threading.Event()
+
+    def put(self, item: Optional[bytes]) -> bool:
+        """Queue an item, waiting for room; False once the consumer has gone away"""
+        while not self.cancelled.is_set():
+            try:
+                self.queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        if not self.put(chunk):
+            raise BrokenPipeError("Export consumer went away")
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def stream_export(fmt: str = "arrow", history: bool = False, since: Optional[datetime] = None,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Run the export in a worker thread; returns an iterator over its bytes as they are produced.
+    Raises ExportUnavailable up front so callers can answer before streaming starts."""
+    _pyarrow()
+    return _stream(fmt, history, since, chunk_size)
+
+
+def _stream(fmt: str, history: bool, since: Optional[datetime], chunk_size: int) -> Iterator[bytes]:
+    sink = _QueueSink()
+    failure = []
+
+    def produce():
+        try:
+            rows = write_export(sink, fmt, history, since, chunk_size)
+            logger.info(f"Exported {rows} {'history' if history else 'current'} score rows as {fmt}")
+        except BrokenPipeError:
+            pass
+        except Exception as e:
+            logger.error(f"Score export failed: {e}")
+            failure.append(e)
+        finally:
+            sink.put(None)
+
+    thread = threading.Thread(target=produce, name="helios-export", daemon=True)
+    thread.start()
+    try:
+        while True:
+            chunk = sink.queue.get()
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        # The client may have disconnected mid-stream, and this can run on the event loop
+        # when the generator is collected: signal the producer and return without joining.
+        # It stops at its next write, after the cursor fetch in progress.
+        sink.cancelled.set()
+    if failure:
+        raise failure[0]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Export the Helios score book as Arrow IPC or Parquet")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="parquet")
+    parser.add_argument("--history", action="store_true", help="export every assessment, not just the latest")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="only rows at or after this ISO timestamp")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--output", "-o", default="-", help="output path, or - for stdout")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    try:
+        if args.output == "-":
+            rows = write_export(sys.stdout.buffer, args.format, args.history, args.since, args.chunk_size)
+        else:
+            with open(args.output, "wb") as fh:
+                rows = write_export(fh, args.format, args.history, args.since, args.chunk_size)
+    except ExportUnavailable as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    print(f"Wrote {rows} rows", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+"""
+Cross-vault exposure index for Helios Risk Oracle
+Maintains inverted indexes (originator -> vaults, asset type -> vaults) with the value
+each vault holds, fed from the composition.assets that ingestion already fetches. Each
+vault's holdings are a row of a sparse vault x originator matrix. Fleet totals are kept
+incrementally, so updating one vault is O(assets in that vault). Fleet-wide concentration
+metrics are computed in one pass over the COO triplets with numpy bincount.
+
+Assets without an originator count towards asset-type concentration only; pooling them
+under a synthetic originator would make it look like one giant lender.
+
+The index lives in process memory. Each assessment's holdings are also persisted, and every
+worker restores the whole fleet's holdings from the database at startup and refreshes them
+periodically (see restore_vault), so workers see vaults other workers assessed. The systemic
+(fleet share) term is held at a neutral 50 until the index covers HELIOS_EXPOSURE_MIN_COVERAGE
+of the registered fleet; the per-vault HHI terms do not depend on other vaults and are
+always applied.
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Share of the score lost to each kind of concentration (they sum to 1)
+ORIGINATOR_HHI_WEIGHT = 0.45
+ASSET_TYPE_HHI_WEIGHT = 0.25
+SYSTEMIC_WEIGHT = 0.30
+# Systemic penalty used until the index covers enough of the fleet (a term score of 50)
+NEUTRAL_SYSTEMIC = 0.5
+
+ChangeCallback = Callable[[Set[str], List[Tuple[int, str]]], None]
+
+
+class _Interner:
+    """Stable small-integer column ids for originators / asset types"""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+
+    def __call__(self, name: str) -> int:
+        idx = self.ids.get(name)
+        if idx is None:
+            idx = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return idx
+
+
+Asset = Tuple[Optional[str], str, float]  # (originator, asset type, value)
+
+
+class _Holdings:
+    __slots__ = ("owner", "assets", "as_of", "originators", "originator_values", "asset_types", "values")
+
+    def __init__(self, owner: str, assets: List[Asset], as_of: float, originators: np.ndarray,
+                 originator_values: np.ndarray, asset_types: np.ndarray, values: np.ndarray):
+        self.owner = owner
+        self.assets = assets
+        self.as_of = as_of  # epoch seconds of the assessment these holdings came from
+        # Assets with a known originator only
+        self.originators = originators
+        self.originator_values = originator_values
+        # Every asset
+        self.asset_types = asset_types
+        self.values = values
+
+
+def _by_column(cols: np.ndarray, values: np.ndarray) -> Dict[int, float]:
+    if not len(cols):
+        return {}
+    uniq, inverse = np.unique(cols, return_inverse=True)
+    sums = np.bincount(inverse, weights=values)
+    return dict(zip(uniq.tolist(), sums.tolist()))
+
+
+def _grow(array: np.ndarray, size: int) -> np.ndarray:
+    if size <= len(array):
+        return array
+    grown = np.zeros(max(size, 2 * len(array)), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class ExposureIndex:
+    def __init__(self, min_fleet_coverage: float = 0.8):
+        self._originators = _Interner()
+        self._asset_types = _Interner()
+        self._vaults: Dict[int, _Holdings] = {}
+        self._by_originator: Dict[int, Set[int]] = {}
+        self._by_asset_type: Dict[int, Set[int]] = {}
+        self._originator_totals = np.zeros(64)
+        self._asset_type_totals = np.zeros(16)
+        self._attributed_total = 0.0  # fleet value with a known originator
+        self.min_fleet_coverage = min_fleet_coverage
+        self.registered_vaults = 0  # fleet size from the vault registry, see set_registered_vaults
+        self._lock = threading.Lock()
+        self.listeners: List[ChangeCallback] = []
+
+    @classmethod
+    def from_env(cls) -> "ExposureIndex":
+        return cls(min_fleet_coverage=float(os.getenv("HELIOS_EXPOSURE_MIN_COVERAGE", 0.8)))
+
+    def __len__(self) -> int:
+        return len(self._vaults)
+
+    def set_registered_vaults(self, count: int) -> None:
+        self.registered_vaults = max(0, int(count))
+
+    @property
+    def coverage(self) -> float:
+        """Share of the registered fleet present in this process's index"""
+        if self.registered_vaults <= 0:
+            return 0.0
+        return min(1.0, len(self._vaults) / self.registered_vaults)
+
+    @property
+    def systemic_ready(self) -> bool:
+        return self.registered_vaults > 0 and self.coverage >= self.min_fleet_coverage
+
+    @staticmethod
+    def _parse_assets(assets: Iterable[Dict]) -> List[Asset]:
+        parsed = []
+        for asset in assets or []:
+            try:
+                value = float(asset.get("value", 0))
+            except (TypeError, ValueError):
+                continue
+            if value <= 0:
+                continue
+            originator = str(asset["originator"]).lower() if asset.get("originator") else None
+            # On-chain RWAAsset uses asset_type; mock and off-chain feeds use type
+            asset_type = str(asset.get("asset_type") or asset.get("type") or "unknown")
+            parsed.append((originator, asset_type, value))
+        return parsed
+
+    def holdings(self, vault_id: int) -> Optional[List[Dict]]:
+        """A vault's normalized assets, in the form update_vault and restore_vault accept"""
+        with self._lock:
+            held = self._vaults.get(vault_id)
+            if held is None:
+                return None
+            return [{"originator": o, "asset_type": t, "value": v} for o, t, v in held.assets]
+
+    def update_vault(self, vault_id: int, owner_address: str, assets: Iterable[Dict]) -> Set[str]:
+        """Replace a vault's holdings; returns originators whose exposure to it changed"""
+        changed_names, old = self._replace(vault_id, owner_address, self._parse_assets(assets), time.time())
+        # A vault's first sighting only adds to fleet totals; propagating it would rescore the
+        # whole fleet during warm-up, so only changes to known holdings fan out
+        if changed_names and old is not None:
+            self._notify(changed_names, exclude=vault_id)
+        return changed_names
+
+    def restore_vault(self, vault_id: int, owner_address: str, assets: Iterable[Dict], as_of: float) -> bool:
+        """Load persisted holdings (another worker's assessment, or one from before a restart)
+        without notifying listeners; skipped if the index already has holdings at least as new"""
+        _, old = self._replace(vault_id, owner_address, self._parse_assets(assets), as_of, keep_newer=True)
+        return old is None or old.as_of < as_of
+
+    def _replace(self, vault_id: int, owner_address: str, parsed: List[Asset], as_of: float,
+                 keep_newer: bool = False) -> Tuple[Set[str], Optional[_Holdings]]:
+        with self._lock:
+            old = self._vaults.get(vault_id)
+            if keep_newer and old is not None and old.as_of >= as_of:
+                return set(), old
+            new = _Holdings(
+                owner_address,
+                parsed,
+                as_of,
+                np.array([self._originators(o) for o, _, _ in parsed if o], dtype=np.int32),
+                np.array([v for o, _, v in parsed if o], dtype=np.float64),
+                np.array([self._asset_types(t) for _, t, _ in parsed], dtype=np.int32),
+                np.array([v for _, _, v in parsed], dtype=np.float64),
+            )
+            old_by_orig = _by_column(old.originators, old.originator_values) if old else {}
+            new_by_orig = _by_column(new.originators, new.originator_values)
+            changed = {
+                o for o in old_by_orig.keys() | new_by_orig.keys()
+                if not np.isclose(old_by_orig.get(o, 0.0), new_by_orig.get(o, 0.0))
+            }
+
+            self._originator_totals = _grow(self._originator_totals, len(self._originators.names))
+            self._asset_type_totals = _grow(self._asset_type_totals, len(self._asset_types.names))
+            if old is not None:
+                np.subtract.at(self._originator_totals, old.originators, old.originator_values)
+                np.subtract.at(self._asset_type_totals, old.asset_types, old.values)
+                self._attributed_total -= float(old.originator_values.sum())
+                for o in set(old.originators.tolist()):
+                    self._by_originator[o].discard(vault_id)
+                for t in set(old.asset_types.tolist()):
+                    self._by_asset_type[t].discard(vault_id)
+            np.add.at(self._originator_totals, new.originators, new.originator_values)
+            np.add.at(self._asset_type_totals, new.asset_types, new.values)
+            self._attributed_total += float(new.originator_values.sum())
+            for o in set(new.originators.tolist()):
+                self._by_originator.setdefault(o, set()).add(vault_id)
+            for t in set(new.asset_types.tolist()):
+                self._by_asset_type.setdefault(t, set()).add(vault_id)
+            self._vaults[vault_id] = new
+            changed_names = {self._originators.names[o] for o in changed}
+        return changed_names, old
+
+    def vaults_exposed_to(self, originators: Iterable[str]) -> List[Tuple[int, str]]:
+        """(vault_id, owner) of every vault holding assets from any of the originators"""
+        with self._lock:
+            vault_ids: Set[int] = set()
+            for name in originators:
+                idx = self._originators.ids.get(str(name).lower())
+                if idx is not None:
+                    vault_ids |= self._by_originator.get(idx, set())
+            return sorted((v, self._vaults[v].owner) for v in vault_ids)
+
+    def mark_originator_changed(self, originator: str) -> List[Tuple[int, str]]:
+        """Off-chain data for an originator changed (e.g. reputation); notify exposed vaults"""
+        affected = self.vaults_exposed_to([originator])
+        if affected:
+            self._notify_listeners({str(originator).lower()}, affected)
+        return affected
+
+    def _notify(self, originators: Set[str], exclude: int) -> None:
+        affected = [(v, owner) for v, owner in self.vaults_exposed_to(originators) if v != exclude]
+        if affected:
+            self._notify_listeners(originators, affected)
+
+    def _notify_listeners(self, originators: Set[str], affected: List[Tuple[int, str]]) -> None:
+        for listener in self.listeners:
+            try:
+                listener(originators, affected)
+            except Exception as e:
+                logger.warning(f"Exposure change listener failed: {e}")
+
+    # ---- concentration ----
+
+    def _vault_metrics(self, holdings: _Holdings) -> Tuple[float, float, float]:
+        """Originator HHI over attributed value, asset-type HHI over all value, and the
+        fleet share of the vault's originators weighted by the value they hold"""
+        total = float(holdings.values.sum())
+        attributed = float(holdings.originator_values.sum())
+        if total <= 0 or attributed <= 0:
+            return 0.0, 0.0, 0.0
+        orig_w = np.bincount(holdings.originators, weights=holdings.originator_values / attributed)
+        type_w = np.bincount(holdings.asset_types, weights=holdings.values / total)
+        if self.systemic_ready:
+            fleet_share = self._originator_totals[holdings.originators] / max(self._attributed_total, 1e-9)
+            systemic = float((holdings.originator_values / total) @ fleet_share)
+        else:
+            systemic = NEUTRAL_SYSTEMIC
+        return float(orig_w @ orig_w), float(type_w @ type_w), systemic
+
+    @staticmethod
+    def _to_score(hhi_orig: float, hhi_type: float, systemic: float) -> int:
+        penalty = ORIGINATOR_HHI_WEIGHT * hhi_orig + ASSET_TYPE_HHI_WEIGHT * hhi_type + SYSTEMIC_WEIGHT * systemic
+        return int(round(100 * (1.0 - min(1.0, penalty))))
+
+    def concentration_score(self, vault_id: int) -> Optional[int]:
+        """0-100 (higher is healthier): penalises a vault whose value sits with few originators
+        or asset types, or with originators that dominate the whole fleet. None when no
+        asset of the vault names an originator."""
+        with self._lock:
+            holdings = self._vaults.get(vault_id)
+            if holdings is None or not holdings.originator_values.sum() > 0:
+                return None
+            return self._to_score(*self._vault_metrics(holdings))
+
+    def fleet_metrics(self, top: int = 10) -> Dict:
+        """Fleet-wide concentration from the sparse COO triplets in one vectorized pass"""
+        with self._lock:
+            vault_ids = list(self._vaults)
+            if not vault_ids:
+                return {"vaults": 0, "fleet_value": 0.0, "attributed_value": 0.0, "originators": [], "asset_types": [], "concentration_scores": {}}
+            lengths = [len(self._vaults[v].values) for v in vault_ids]
+            orig_lengths = [len(self._vaults[v].originator_values) for v in vault_ids]
+            rows = np.repeat(np.arange(len(vault_ids)), lengths)
+            orig_rows = np.repeat(np.arange(len(vault_ids)), orig_lengths)
+            orig = np.concatenate([self._vaults[v].originators for v in vault_ids])
+            orig_vals = np.concatenate([self._vaults[v].originator_values for v in vault_ids])
+            types = np.concatenate([self._vaults[v].asset_types for v in vault_ids])
+            vals = np.concatenate([self._vaults[v].values for v in vault_ids])
+            originator_names = list(self._originators.names)
+            type_names = list(self._asset_types.names)
+            vaults_per_originator = np.array(
+                [len(self._by_originator.get(i, ())) for i in range(len(originator_names))], dtype=np.int64
+            )
+            coverage = self.coverage
+            systemic_ready = self.systemic_ready
+
+        fleet_total = vals.sum()
+        attributed_total = orig_vals.sum()
+        orig_totals = np.bincount(orig, weights=orig_vals, minlength=len(originator_names))
+        type_totals = np.bincount(types, weights=vals, minlength=len(type_names))
+        row_totals = np.bincount(rows, weights=vals, minlength=len(vault_ids))
+        row_attributed = np.bincount(orig_rows, weights=orig_vals, minlength=len(vault_ids))
+
+        # Per-vault HHI: square the per-(vault, column) weight sums; key = row * ncols + col
+        def hhi(r: np.ndarray, cols: np.ndarray, w: np.ndarray, ncols: int) -> np.ndarray:
+            keys, inverse = np.unique(r.astype(np.int64) * ncols + cols, return_inverse=True)
+            cell = np.bincount(inverse, weights=w)
+            return np.bincount(keys // ncols, weights=cell ** 2, minlength=len(vault_ids))
+
+        hhi_orig = hhi(orig_rows, orig, orig_vals / np.maximum(row_attributed[orig_rows], 1e-9),
+                       max(len(originator_names), 1))
+        hhi_type = hhi(rows, types, vals / np.maximum(row_totals[rows], 1e-9), max(len(type_names), 1))
+        if systemic_ready:
+            systemic = np.bincount(
+                orig_rows,
+                weights=orig_vals / np.maximum(row_totals[orig_rows], 1e-9) * orig_totals[orig] / max(attributed_total, 1e-9),
+                minlength=len(vault_ids),
+            )
+        else:
+            systemic = np.full(len(vault_ids), NEUTRAL_SYSTEMIC)
+        penalty = ORIGINATOR_HHI_WEIGHT * hhi_orig + ASSET_TYPE_HHI_WEIGHT * hhi_type + SYSTEMIC_WEIGHT * systemic
+        scores = np.rint(100 * (1.0 - np.minimum(1.0, penalty))).astype(int)
+        scored = row_attributed > 0
+
+        def ranked(totals: np.ndarray, names: List[str], denominator: float,
+                   counts: Optional[np.ndarray] = None) -> List[Dict]:
+            order = np.argsort(-totals)[:top]
+            return [
+                {
+                    "name": names[i],
+                    "exposure": float(totals[i]),
+                    "share": float(totals[i] / denominator) if denominator else 0.0,
+                    **({"vaults": int(counts[i])} if counts is not None else {}),
+                }
+                for i in order if totals[i] > 0
+            ]
+
+        return {
+            "vaults": len(vault_ids),
+            "fleet_coverage": round(coverage, 4),
+            "systemic_applied": systemic_ready,
+            "fleet_value": float(fleet_total),
+            "attributed_value": float(attributed_total),
+            "originator_hhi": float(((orig_totals / attributed_total) ** 2).sum()) if attributed_total else 0.0,
+            "asset_type_hhi": float(((type_totals / fleet_total) ** 2).sum()) if fleet_total else 0.0,
+            "originators": ranked(orig_totals, originator_names, attributed_total, vaults_per_originator),
+            "asset_types": ranked(type_totals, type_names, fleet_total),
+            "concentration_scores": {v: s for v, s, ok in zip(vault_ids, scores.tolist(), scored.tolist()) if ok},
+        }
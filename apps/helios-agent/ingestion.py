@@ -4,15 +4,16 @@ Integrates with Nodit API for on-chain data and simulates off-chain data sources
 """
 
 import os
-import requests
-import json
 import asyncio
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import logging
-from urllib.parse import urljoin
 from dotenv import load_dotenv
 
+from endpoints import get_fullnode_pool
+from metrics import stage_timer, MOCK_FALLBACKS
+from ratelimit import UpstreamLimiter, request_priority, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
@@ -20,8 +21,7 @@ logger = logging.getLogger(__name__)
 class DataIngestionAgent:
     def __init__(self):
         self.nodit_api_key = os.getenv("NODIT_API_KEY", "demo_key")
-        self.aptos_node_url = os.getenv("APTOS_NODE_URL", "https://fullnode.testnet.aptoslabs.com/v1")
-        self.nodit_base_url = "https://aptos-testnet.nodit.io/v1"
+        self.nodit_base_url = os.getenv("NODIT_BASE_URL", "https://aptos-testnet.nodit.io/v1")
         
         # Initialize headers for Nodit API
         self.headers = {
@@ -29,17 +29,18 @@ class DataIngestionAgent:
             "Content-Type": "application/json"
         }
 
-    def _fullnode_get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        # Per-upstream rate limiting (token bucket + adaptive concurrency)
+        self.nodit_limiter = UpstreamLimiter.from_env("NODIT", rate=10)
+        # Fullnode reads are health-routed and hedged across APTOS_NODE_URLS
+        self.fullnode_pool = get_fullnode_pool()
+
+    async def _fullnode_get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
         """Basic GET against Aptos fullnode REST API"""
-        base = self.aptos_node_url.rstrip('/') + '/'
-        url = urljoin(base, path.lstrip('/'))
-        resp = requests.get(url, params=params, timeout=10)
-        resp.raise_for_status()
-        return resp.json()
+        return await self.fullnode_pool.get(path, params=params, timeout=10)
 
-    def _account_resources(self, address: str) -> List[Dict[str, Any]]:
+    async def _account_resources(self, address: str) -> List[Dict[str, Any]]:
         try:
-            return self._fullnode_get(f"/accounts/{address}/resources")
+            return await self._fullnode_get(f"/accounts/{address}/resources")
         except Exception as e:
             logger.warning(f"account_resources failed: {e}")
             return []
@@ -47,7 +48,8 @@ class DataIngestionAgent:
     async def check_nodit_connection(self) -> bool:
         """Check if Nodit API is accessible"""
         try:
-            response = requests.get(
+            response = await self.nodit_limiter.request(
+                "GET",
                 f"{self.nodit_base_url}/accounts/0x1",
                 headers=self.headers,
                 timeout=5
@@ -56,20 +58,33 @@ class DataIngestionAgent:
         except:
             return False
     
-    async def fetch_vault_data(self, vault_id: int, owner_address: str) -> Dict:
+    async def fetch_vault_data(
+        self,
+        vault_id: int,
+        owner_address: str,
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> Dict:
         """Fetch comprehensive vault data from multiple sources"""
+        with request_priority(priority):
+            return await self._fetch_vault_data(vault_id, owner_address)
+
+    async def _fetch_vault_data(self, vault_id: int, owner_address: str) -> Dict:
         try:
             # Fetch on-chain data
-            on_chain_data = await self.fetch_onchain_data(owner_address, vault_id)
+            with stage_timer("ingest.onchain"):
+                on_chain_data = await self.fetch_onchain_data(owner_address, vault_id)
             
             # Fetch vault events from Nodit
-            events = await self.fetch_vault_events(owner_address, vault_id)
+            with stage_timer("ingest.events"):
+                events = await self.fetch_vault_events(owner_address, vault_id)
             
             # Fetch asset composition
-            composition = await self.fetch_vault_composition(vault_id, owner_address)
+            with stage_timer("ingest.composition"):
+                composition = await self.fetch_vault_composition(vault_id, owner_address)
             
             # Simulate off-chain data
-            off_chain_data = await self.fetch_offchain_data(vault_id)
+            with stage_timer("ingest.offchain"):
+                off_chain_data = await self.fetch_offchain_data(vault_id)
             
             return {
                 "vault_id": vault_id,
@@ -83,13 +98,14 @@ class DataIngestionAgent:
         except Exception as e:
             logger.error(f"Error fetching vault data: {str(e)}")
             # Return mock data if real fetching fails
+            MOCK_FALLBACKS.inc("vault_data")
             return self._get_mock_vault_data(vault_id, owner_address)
     
     async def fetch_onchain_data(self, address: str, vault_id: int) -> Dict:
         """Fetch on-chain vault data from Aptos"""
         try:
             # Get account resources
-            resources = self._account_resources(address)
+            resources = await self._account_resources(address)
             
             vault_data = {}
             for resource in resources:
@@ -111,13 +127,15 @@ class DataIngestionAgent:
             # Use Nodit's event API
             endpoint = f"{self.nodit_base_url}/accounts/{address}/events"
             
-            response = requests.get(
+            response = await self.nodit_limiter.request(
+                "GET",
                 endpoint,
                 headers=self.headers,
                 params={
                     "limit": 100,
                     "offset": 0
-                }
+                },
+                timeout=10
             )
             
             if response.status_code == 200:
@@ -135,6 +153,7 @@ class DataIngestionAgent:
         except Exception as e:
             logger.warning(f"Could not fetch events from Nodit: {str(e)}")
             # Return mock events for demo
+            MOCK_FALLBACKS.inc("events")
             return [
                 {
                     "type": "VaultCreated",
@@ -152,7 +171,7 @@ class DataIngestionAgent:
         """Get current asset composition of a vault"""
         try:
             # Try to get real data from chain
-            resources = self._account_resources(address)
+            resources = await self._account_resources(address)
             
             for resource in resources:
                 if "Vault" in resource["type"]:
@@ -168,6 +187,7 @@ class DataIngestionAgent:
             pass
         
         # Return mock data for demo
+        MOCK_FALLBACKS.inc("composition")
         return {
             "vault_id": vault_id,
             "total_value": 5000000,
@@ -187,7 +207,8 @@ class DataIngestionAgent:
                     "risk_rating": "BB"
                 }
             ],
-            "asset_diversity": 0.6  # Diversity score
+            "asset_diversity": 0.6,  # Diversity score
+            "mock": True
         }
     
     async def fetch_offchain_data(self, vault_id: int) -> Dict:
@@ -242,7 +263,8 @@ class DataIngestionAgent:
                 "assets": [
                     {"type": "invoice", "value": 2000000},
                     {"type": "real_estate", "value": 3000000}
-                ]
+                ],
+                "mock": True
             },
             "off_chain": {
                 "average_credit_score": 720,
@@ -258,7 +280,7 @@ class DataIngestionAgent:
         # For hackathon, use simple polling
         while True:
             try:
-                data = await self.fetch_vault_data(vault_id, "")
+                data = await self.fetch_vault_data(vault_id, "", priority=PRIORITY_BACKGROUND)
                 await callback(data)
                 await asyncio.sleep(30)  # Poll every 30 seconds
             except Exception as e:
@@ -1,27 +1,178 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Header, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse, JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, List
 import asyncio
+import hmac
+import json
 import os
-from datetime import datetime
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
 import logging
-import requests
 from sqlalchemy import text, func
 
 from ingestion import DataIngestionAgent
 from modeling import RiskModelingEngine
 from publisher import OraclePublisher
-from db import init_db, get_session, HealthScoreModel, engine
+from endpoints import get_fullnode_pool
+from ratelimit import PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from triggers import EventTriggerPipeline
+from reconcile import ScoreReconciler
+from snapshot import ScoreSnapshot
+import export
+from push import ScoreBroadcaster, PgNotifyBridge, NOTIFY_CHANNEL, EVICTED, notify_payload, parse_vault_filter
+import metrics
+from metrics import stage_timer
+from profiling import sample_stacks, to_folded, ProfilerBusy
+from tracing import Span, tracer, instrument_engine
+from db import (
+    init_db, get_session, HealthScoreModel, HealthScoreHistoryModel, VaultRegistryModel, VaultHoldingsModel, engine
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Startup state reported by /ready; /live only says the process is serving
+readiness = {"schema": False, "publisher": False, "fullnode": False, "warmup_seconds": None}
+_background_tasks = set()
+
+
+async def _init_schema() -> None:
+    """Run create_all off the event loop, retrying until the database is reachable"""
+    delay = 1.0
+    while True:
+        try:
+            await asyncio.to_thread(init_db)
+            break
+        except Exception as e:
+            logger.warning(f"Schema init failed, retrying in {delay:.0f}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(30.0, delay * 2)
+    readiness["schema"] = True
+    await asyncio.to_thread(_warm_db_pool)
+    score_bridge.start()
+    try:
+        await asyncio.to_thread(_sync_snapshot)
+    except Exception as e:
+        logger.warning(f"Score snapshot sync failed: {e}")
+
+
+def _warm_db_pool() -> None:
+    """Open pooled connections up front so the first requests don't pay for connects"""
+    size_fn = getattr(engine.pool, "size", None)
+    count = min(size_fn() if size_fn else 1, int(os.getenv("HELIOS_DB_WARM_CONNECTIONS", 5)))
+    conns = []
+    try:
+        for _ in range(count):
+            conn = engine.connect()
+            conn.execute(text("SELECT 1"))
+            conns.append(conn)
+    except Exception as e:
+        logger.warning(f"DB pool warm-up stopped early: {e}")
+    finally:
+        for conn in conns:
+            conn.close()
+
+
+def _sync_snapshot(since: Optional[datetime] = None) -> None:
+    """Fill a new snapshot from Postgres, or catch up on scores written while we were down
+    (or, with `since`, while the LISTEN bridge was disconnected). Only one worker per host
+    does this; the others serve from the map as it fills."""
+    if not score_snapshot.is_open:
+        return
+    with score_snapshot.rebuild_guard() as owner:
+        if not owner:
+            return
+        complete = score_snapshot.complete
+        session = get_session()
+        try:
+            query = session.query(
+                HealthScoreModel.vault_id, HealthScoreModel.score,
+                HealthScoreModel.risk_factors, HealthScoreModel.timestamp,
+            )
+            newest = score_snapshot.newest_timestamp
+            if since is not None and complete:
+                query = query.filter(HealthScoreModel.timestamp >= since - timedelta(minutes=5))
+            elif complete and newest is not None:
+                # Small overlap covers writers whose clocks or commits lag slightly
+                query = query.filter(HealthScoreModel.timestamp >= newest - timedelta(minutes=5))
+            started = time.perf_counter()
+            count = 0
+            chunk = []
+            # Rows are fetched before each load() so the snapshot lock never waits on the DB
+            for row in query.yield_per(1000):
+                chunk.append(tuple(row))
+                if len(chunk) >= 1000:
+                    count += score_snapshot.load(chunk)
+                    chunk = []
+            count += score_snapshot.load(chunk)
+            score_snapshot.mark_complete()
+            logger.info(
+                f"Score snapshot {'caught up' if complete else 'rebuilt'}: "
+                f"{count} rows in {time.perf_counter() - started:.3f}s"
+            )
+        finally:
+            session.close()
+
+
+async def _load_publisher() -> None:
+    await oracle_publisher.ensure_sdk()
+    readiness["publisher"] = True
+
+
+async def _warm_fullnodes() -> None:
+    try:
+        await fullnode_pool.get("/", timeout=5)
+        readiness["fullnode"] = True
+    except Exception as e:
+        logger.warning(f"Fullnode warm-up failed: {e}")
+
+
+async def _warm_up() -> None:
+    started = time.perf_counter()
+    await asyncio.gather(_init_schema(), _load_publisher(), _warm_fullnodes())
+    readiness["warmup_seconds"] = round(time.perf_counter() - started, 3)
+    logger.info(f"Warm-up finished in {readiness['warmup_seconds']}s")
+    if os.getenv("HELIOS_EVENT_TRIGGERS", "true").lower() in ("1", "true", "yes"):
+        event_triggers.start()
+    reconciler.start()
+    task = asyncio.get_running_loop().create_task(_track_fleet_size())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Nothing here blocks: the process answers /live immediately and /ready once warm
+    try:
+        score_snapshot.open()
+    except Exception as e:
+        logger.warning(f"Score snapshot unavailable, serving from Postgres: {e}")
+        score_snapshot.close()
+    loop = asyncio.get_running_loop()
+    for coro in (metrics.monitor_event_loop_lag(), _warm_up()):
+        task = loop.create_task(coro)
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+    yield
+    await event_triggers.stop()
+    await reconciler.stop()
+    score_bridge.stop()
+    tasks = list(_background_tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    score_snapshot.close()
+
+
 app = FastAPI(
     title="Helios Risk Oracle",
     description="AI-powered risk assessment for StrataFi RWA vaults",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Enable CORS
@@ -33,17 +184,68 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize DB and agents
-init_db()
+# Initialize agents (schema init and SDK loading happen in the lifespan warm-up)
 ingestion_agent = DataIngestionAgent()
 modeling_engine = RiskModelingEngine()
 oracle_publisher = OraclePublisher()
+fullnode_pool = get_fullnode_pool()
+instrument_engine(engine)
+
+# Live score push: local fan-out plus LISTEN/NOTIFY relay between replicas
+score_broadcaster = ScoreBroadcaster(queue_size=int(os.getenv("HELIOS_PUSH_QUEUE_SIZE", 64)))
+# Host-wide hot copy of every vault's latest score, shared by all workers via mmap
+score_snapshot = ScoreSnapshot.from_env()
+
+
+def _snapshot_remote_update(update: Dict) -> None:
+    score_snapshot.put(
+        int(update["vault_id"]), update["score"], update.get("risk_factors"),
+        datetime.fromisoformat(update["timestamp"]) if update.get("timestamp") else None,
+    )
+
+
+def _snapshot_catch_up(disconnected_at: float) -> None:
+    """NOTIFYs sent while LISTEN was down are lost; reload scores written since then"""
+    _sync_snapshot(since=datetime.fromtimestamp(disconnected_at))
+
+
+score_bridge = PgNotifyBridge(
+    engine, score_broadcaster, on_remote=_snapshot_remote_update, on_reconnect=_snapshot_catch_up
+)
+PUSH_HEARTBEAT_SECONDS = float(os.getenv("HELIOS_PUSH_HEARTBEAT_SECONDS", 15))
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Open a root trace span for sampled requests (or those sending X-Helios-Trace: 1)"""
+    force = request.headers.get("x-helios-trace") == "1"
+    with tracer.root_span(f"{request.method} {request.url.path}", force=force) as span:
+        response = await call_next(request)
+        if span is not None:
+            span.set_attribute("http.status_code", response.status_code)
+            response.headers["X-Helios-Trace-Id"] = span.trace_id
+        return response
+
+
+def require_schema() -> None:
+    """Endpoints that write scores wait for warm-up to create the schema"""
+    if not readiness["schema"]:
+        raise HTTPException(status_code=503, detail="Database schema not ready", headers={"Retry-After": "5"})
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Admin endpoints are disabled unless HELIOS_ADMIN_TOKEN is set and presented"""
+    expected = os.getenv("HELIOS_ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, expected):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
 
 DEFAULT_RISK_FACTORS = {
     "asset_diversity": 50,
     "ltv_ratio": 50,
     "originator_reputation": 50,
     "market_conditions": 50,
+    "concentration_risk": 50,
 }
 
 class HealthScore(BaseModel):
@@ -66,6 +268,19 @@ async def root():
         "version": "1.0.0"
     }
 
+@app.get("/live", response_model=dict)
+async def live():
+    """Liveness: the process is up and serving requests"""
+    return {"status": "alive"}
+
+
+@app.get("/ready", response_model=dict)
+async def ready():
+    """Readiness: schema verified and publisher loaded; 503 until warm-up completes"""
+    is_ready = readiness["schema"] and readiness["publisher"]
+    body = {"status": "ready" if is_ready else "starting", **readiness}
+    return JSONResponse(body, status_code=200 if is_ready else 503)
+
 @app.get("/api/v1/status", response_model=dict)
 @app.get("/api/status", response_model=dict)
 @app.get("/status", response_model=dict)
@@ -74,7 +289,7 @@ async def status():
     sdk_available = getattr(oracle_publisher, "_sdk_available", False)
     use_async = getattr(oracle_publisher, "_use_async", False)
     has_private_key = bool(os.getenv("HELIOS_AGENT_PRIVATE_KEY"))
-    node_url = os.getenv("APTOS_NODE_URL", "https://fullnode.testnet.aptoslabs.com/v1")
+    node_url = fullnode_pool.best_url()
 
     # DB connectivity and aggregates
     db_connected = False
@@ -96,13 +311,11 @@ async def status():
     except Exception:
         db_connected = False
 
-    # Chain ID via REST and Aptos connectivity
+    # Chain ID via REST (best fullnode, hedged) and Aptos connectivity
     chain_id = None
     try:
-        r = requests.get(node_url.rstrip('/') + '/', timeout=5)
-        if r.ok:
-            data = r.json()
-            chain_id = data.get("chain_id")
+        data = await fullnode_pool.get("/", timeout=5)
+        chain_id = data.get("chain_id")
     except Exception:
         pass
     aptos_connected = chain_id is not None
@@ -127,10 +340,12 @@ async def status():
         "service": "Helios Risk Oracle",
         "version": "1.0.0",
         "sdk_available": sdk_available,
+        "ready": readiness["schema"] and readiness["publisher"],
         "sdk_mode": ("async" if use_async else ("sync" if sdk_available else "unavailable")),
         "has_private_key": has_private_key,
         "db_connected": db_connected,
         "node_url": node_url,
+        "fullnode_endpoints": fullnode_pool.status(),
         "chain_id": chain_id,
         "time": datetime.now().isoformat(),
         # Frontend health-monitor fields
@@ -141,11 +356,14 @@ async def status():
         "last_health_check": last_health_check.isoformat() if last_health_check else None,
         "average_health_score": average_health_score,
         "system_load": system_load,
+        "rescore_queue_depth": len(event_triggers.queue),
     }
 
 @app.get("/api/v1/vaults", response_model=List[int])
 async def list_monitored_vaults():
     """Return list of vault IDs with stored health scores"""
+    if score_snapshot.complete:
+        return await asyncio.to_thread(score_snapshot.vault_ids)
     try:
         session = get_session()
         ids = [row[0] for row in session.query(HealthScoreModel.vault_id).all()]
@@ -159,6 +377,10 @@ async def list_monitored_vaults():
 @app.get("/api/v1/vaults/{vault_id}/health", response_model=HealthScore)
 async def get_health_score(vault_id: int):
     """Get the current health score for a vault"""
+    cached = score_snapshot.get(vault_id)
+    if cached is not None:
+        score, risk_factors, timestamp = cached
+        return HealthScore(vault_id=vault_id, score=score, risk_factors=risk_factors, timestamp=timestamp)
     try:
         session = get_session()
         rec = session.query(HealthScoreModel).filter(HealthScoreModel.vault_id == vault_id).first()
@@ -176,56 +398,448 @@ async def get_health_score(vault_id: int):
         except Exception:
             pass
 
-@app.post("/api/v1/vaults/{vault_id}/assess", response_model=HealthScore)
+async def run_assessment(vault_id: int, vault_owner: str, priority: int = PRIORITY_INTERACTIVE) -> Dict:
+    """Ingest, model and persist a vault's health score; returns the risk assessment"""
+    # Step 1: Ingest data
+    logger.info(f"Ingesting data for vault {vault_id}")
+    vault_data = await ingestion_agent.fetch_vault_data(
+        vault_id=vault_id,
+        owner_address=vault_owner,
+        priority=priority
+    )
+
+    # Step 2: Run risk modeling
+    logger.info(f"Running risk model for vault {vault_id}")
+    with stage_timer("model"):
+        risk_assessment = await modeling_engine.calculate_health_score(vault_data)
+
+    # Step 3: Store result (Postgres) and push it to live subscribers
+    now_ts = datetime.now()
+    message = json.dumps({
+        "vault_id": vault_id,
+        "score": risk_assessment["score"],
+        "risk_factors": risk_assessment["risk_factors"],
+        "timestamp": now_ts.isoformat(),
+    }, default=str)
+    # Persist the holdings the exposure index now has, so other workers (and restarts) see them
+    composition = vault_data.get("composition") or {}
+    holdings = None if composition.get("mock") else modeling_engine.exposure_index.holdings(vault_id)
+    with stage_timer("db.upsert"):
+        _store_assessment(vault_id, vault_owner, risk_assessment, now_ts, message, holdings)
+    try:
+        score_snapshot.put(vault_id, risk_assessment["score"], risk_assessment["risk_factors"], now_ts)
+    except Exception as e:
+        # The score is already committed; the health endpoint falls back to Postgres
+        logger.warning(f"Score snapshot write for vault {vault_id} failed: {e}")
+    score_broadcaster.publish_encoded(vault_id, message)
+
+    return risk_assessment
+
+
+def _store_assessment(
+    vault_id: int,
+    vault_owner: str,
+    risk_assessment: Dict,
+    now_ts: datetime,
+    message: Optional[str] = None,
+    holdings: Optional[List[Dict]] = None
+) -> None:
+    session = get_session()
+    try:
+        rec = session.query(HealthScoreModel).filter(HealthScoreModel.vault_id == vault_id).first()
+        if rec is None:
+            rec = HealthScoreModel(
+                vault_id=vault_id,
+                score=risk_assessment["score"],
+                risk_factors=risk_assessment["risk_factors"],
+                timestamp=now_ts,
+            )
+            session.add(rec)
+        else:
+            rec.score = risk_assessment["score"]
+            rec.risk_factors = risk_assessment["risk_factors"]
+            rec.timestamp = now_ts
+        session.add(HealthScoreHistoryModel(
+            vault_id=vault_id,
+            score=risk_assessment["score"],
+            risk_factors=risk_assessment["risk_factors"],
+            timestamp=now_ts,
+        ))
+
+        # Remember the owner so on-chain events for this vault can trigger rescoring
+        owner_rec = session.query(VaultRegistryModel).filter(VaultRegistryModel.vault_id == vault_id).first()
+        if owner_rec is None:
+            session.add(VaultRegistryModel(vault_id=vault_id, owner_address=vault_owner, updated_at=now_ts))
+        elif owner_rec.owner_address != vault_owner:
+            owner_rec.owner_address = vault_owner
+            owner_rec.updated_at = now_ts
+
+        if holdings is not None:
+            holdings_rec = session.query(VaultHoldingsModel).filter(VaultHoldingsModel.vault_id == vault_id).first()
+            if holdings_rec is None:
+                session.add(VaultHoldingsModel(
+                    vault_id=vault_id, owner_address=vault_owner, assets=holdings, updated_at=now_ts
+                ))
+            else:
+                holdings_rec.owner_address = vault_owner
+                holdings_rec.assets = holdings
+                holdings_rec.updated_at = now_ts
+
+        # NOTIFY is transactional: other replicas only hear about committed scores
+        if message is not None and engine.dialect.name == "postgresql":
+            session.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": NOTIFY_CHANNEL, "payload": notify_payload(score_broadcaster, message)},
+            )
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+async def rescore_vault(vault_id: int, vault_owner: str) -> None:
+    """Background rescore (event triggers): assess, then publish on-chain"""
+    risk_assessment = await run_assessment(vault_id, vault_owner, priority=PRIORITY_BACKGROUND)
+    await oracle_publisher.publish_health_score(
+        vault_owner,
+        risk_assessment["score"],
+        risk_assessment["risk_factors"]
+    )
+
+
+event_triggers = EventTriggerPipeline.from_env(rescore_vault)
+
+
+def _rescore_exposed_vaults(originators, affected) -> None:
+    """An originator's exposure changed: rescore only the vaults holding its assets"""
+    if not event_triggers.running:
+        return
+    queued = sum(event_triggers.queue.enqueue(vault_id, owner) for vault_id, owner in affected)
+    logger.info(f"Exposure change for {', '.join(sorted(originators))}: queued {queued} vault rescore(s)")
+
+
+modeling_engine.exposure_index.listeners.append(_rescore_exposed_vaults)
+
+
+FLEET_SIZE_REFRESH_SECONDS = 300
+# Newest holdings update already restored into the exposure index (None: nothing loaded yet)
+_exposure_synced_at: Optional[datetime] = None
+
+
+def _count_registered_vaults() -> int:
+    session = get_session()
+    try:
+        return session.query(func.count(VaultRegistryModel.vault_id)).scalar() or 0
+    finally:
+        session.close()
+
+
+def _sync_exposure() -> int:
+    """Restore holdings persisted by any worker into this process's exposure index: the whole
+    fleet on the first call, then only rows written since the previous sync"""
+    global _exposure_synced_at
+    index = modeling_engine.exposure_index
+    session = get_session()
+    try:
+        query = session.query(
+            VaultHoldingsModel.vault_id, VaultHoldingsModel.owner_address,
+            VaultHoldingsModel.assets, VaultHoldingsModel.updated_at,
+        )
+        if _exposure_synced_at is not None:
+            # Small overlap covers writers whose commits land slightly after their timestamp
+            query = query.filter(VaultHoldingsModel.updated_at >= _exposure_synced_at - timedelta(minutes=5))
+        restored = 0
+        newest = _exposure_synced_at
+        for vault_id, owner, assets, updated_at in query.yield_per(1000):
+            restored += index.restore_vault(vault_id, owner, assets or [], updated_at.timestamp())
+            newest = updated_at if newest is None else max(newest, updated_at)
+        _exposure_synced_at = newest
+        return restored
+    finally:
+        session.close()
+
+
+async def _track_fleet_size() -> None:
+    """Keep the exposure index's view of the fleet current: the registered vault count and
+    holdings other workers persisted. Its fleet-share term stays neutral until enough of the
+    fleet is indexed."""
+    while True:
+        try:
+            restored = await asyncio.to_thread(_sync_exposure)
+            count = await asyncio.to_thread(_count_registered_vaults)
+            modeling_engine.exposure_index.set_registered_vaults(count)
+            logger.debug(f"Exposure index: restored {restored} vault(s), coverage {modeling_engine.exposure_index.coverage:.2f}")
+        except Exception as e:
+            logger.warning(f"Could not refresh exposure index: {e}")
+        await asyncio.sleep(FLEET_SIZE_REFRESH_SECONDS)
+
+
+pending_publishes = 0
+
+
+async def publish_in_background(
+    vault_owner: str,
+    score: int,
+    risk_factors: Dict,
+    request_span: Optional[Span] = None
+) -> None:
+    """BackgroundTasks entry point that keeps the publish backlog gauge accurate.
+    Runs after the response is sent, so a traced request gets a linked publish trace."""
+    global pending_publishes
+    try:
+        if request_span is not None:
+            with tracer.root_span("publish_health_score", force=True, links=[request_span]):
+                await oracle_publisher.publish_health_score(vault_owner, score, risk_factors)
+        else:
+            await oracle_publisher.publish_health_score(vault_owner, score, risk_factors)
+    finally:
+        pending_publishes -= 1
+
+
+async def republish_drifted(vault_id: int, vault_owner: str, score: int, risk_factors: Dict) -> Dict:
+    """Reconciliation found the on-chain score out of date; publish the stored one again"""
+    global pending_publishes
+    pending_publishes += 1
+    logger.info(f"Republishing drifted score for vault {vault_id}")
+    try:
+        return await oracle_publisher.publish_health_score(vault_owner, score, risk_factors)
+    finally:
+        pending_publishes -= 1
+
+
+reconciler = ScoreReconciler.from_env(republish_drifted)
+
+
+def _collect_db_pool() -> Dict:
+    pool = engine.pool
+    values = {}
+    for state, attr in (("checked_out", "checkedout"), ("size", "size"), ("overflow", "overflow")):
+        fn = getattr(pool, attr, None)
+        if fn is not None:
+            values[(state,)] = fn()
+    return values
+
+
+def _collect_queues() -> Dict:
+    return {
+        ("rescore",): len(event_triggers.queue),
+        ("publish",): pending_publishes,
+        ("reconcile_publish",): reconciler.publish_queue.qsize(),
+    }
+
+
+def _collect_push() -> Dict:
+    return {
+        ("subscribers",): score_broadcaster.subscriber_count,
+        ("listen_connected",): int(score_bridge.connected),
+    }
+
+
+def _collect_snapshot() -> Dict:
+    return {
+        ("open",): int(score_snapshot.is_open),
+        ("complete",): int(score_snapshot.complete),
+    }
+
+
+def _collect_limiters() -> Dict:
+    limiters = [ingestion_agent.nodit_limiter] + [ep.limiter for ep in fullnode_pool.endpoints]
+    values = {}
+    for limiter in limiters:
+        values[(limiter.name, "queue_depth")] = limiter.queue_depth
+        values[(limiter.name, "in_flight")] = limiter.in_flight
+        values[(limiter.name, "concurrency_limit")] = limiter.concurrency_limit
+        values[(limiter.name, "throttled_exhausted")] = limiter.exhausted_total
+    return values
+
+
+metrics.DB_POOL.add_collector(_collect_db_pool)
+metrics.QUEUE_DEPTH.add_collector(_collect_queues)
+metrics.UPSTREAM.add_collector(_collect_limiters)
+metrics.PUSH.add_collector(_collect_push)
+metrics.PUSH_DELIVERED.add_collector(lambda: {(): score_broadcaster.delivered_total})
+metrics.PUSH_EVICTED.add_collector(lambda: {(): score_broadcaster.evicted_total})
+metrics.SNAPSHOT.add_collector(_collect_snapshot)
+metrics.SNAPSHOT_LOOKUPS.add_collector(lambda: {("hit",): score_snapshot.hits, ("miss",): score_snapshot.misses})
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/api/v1/admin/profile", response_class=PlainTextResponse, dependencies=[Depends(require_admin)])
+async def profile_worker(seconds: float = 10.0, interval_ms: float = 5.0):
+    """Sample this worker's stacks for N seconds; returns folded stacks for flamegraph tools"""
+    if not 0 < seconds <= 60 or not 1 <= interval_ms <= 1000:
+        raise HTTPException(status_code=400, detail="seconds must be in (0, 60] and interval_ms in [1, 1000]")
+    try:
+        stacks = await asyncio.to_thread(sample_stacks, seconds, interval_ms / 1000.0)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(to_folded(stacks))
+
+
+@app.get("/api/v1/export/scores")
+async def export_scores(format: str = "arrow", history: bool = False, since: Optional[datetime] = None):
+    """Bulk export of the score book (or full history) as an Arrow IPC stream or Parquet file"""
+    if format not in export.FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(export.FORMATS)}")
+    try:
+        body = export.stream_export(format, history=history, since=since)
+    except export.ExportUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    media_type, extension = export.FORMATS[format]
+    filename = f"helios_{'history' if history else 'scores'}_{datetime.now():%Y%m%dT%H%M%S}.{extension}"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@app.get("/api/v1/exposure", response_model=dict)
+async def fleet_exposure(top: int = 10):
+    """Fleet-wide originator and asset-type concentration from the exposure index"""
+    return modeling_engine.exposure_index.fleet_metrics(top=max(1, min(top, 100)))
+
+
+@app.get("/api/v1/admin/reconcile", response_model=dict, dependencies=[Depends(require_admin)])
+async def reconcile_status():
+    """Progress of the running reconciliation pass and results of the last one"""
+    return reconciler.status()
+
+
+@app.post("/api/v1/admin/reconcile", response_model=dict, dependencies=[Depends(require_admin), Depends(require_schema)])
+async def start_reconcile():
+    """Start an on-chain vs database score reconciliation pass in the background"""
+    if not reconciler.trigger():
+        raise HTTPException(status_code=409, detail="A reconciliation pass is already running")
+    return reconciler.status()
+
+
+@app.post(
+    "/api/v1/admin/originators/{originator}/rescore",
+    response_model=dict,
+    dependencies=[Depends(require_admin), Depends(require_schema)],
+)
+async def rescore_originator(originator: str):
+    """Off-chain data for an originator changed; queue rescoring of every vault exposed to it"""
+    if not event_triggers.running:
+        raise HTTPException(status_code=503, detail="Rescore queue is not running (HELIOS_EVENT_TRIGGERS)")
+    # Pick up holdings other workers persisted, so the lookup covers the whole fleet
+    try:
+        await asyncio.to_thread(_sync_exposure)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Could not load vault holdings: {e}")
+    affected = modeling_engine.exposure_index.mark_originator_changed(originator)
+    return {"originator": originator, "vaults": [vault_id for vault_id, _ in affected]}
+
+
+def _parse_vaults_param(vaults: Optional[str]):
+    try:
+        return parse_vault_filter(vaults)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="vaults must be a comma-separated list of vault IDs")
+
+
+@app.get("/api/v1/stream/health")
+async def stream_health_scores(request: Request, vaults: Optional[str] = None):
+    """Server-Sent Events feed of score updates for `?vaults=1,2` (omit for the whole fleet)"""
+    vault_ids = _parse_vaults_param(vaults)
+    subscriber = score_broadcaster.subscribe(vault_ids)
+
+    async def events():
+        try:
+            yield f"retry: 5000\n: subscribed to {'fleet' if vault_ids is None else len(vault_ids)}\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), timeout=PUSH_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                if message is EVICTED:
+                    yield "event: evicted\ndata: {\"reason\": \"slow consumer\"}\n\n"
+                    break
+                yield f"event: health\ndata: {message}\n\n"
+        finally:
+            score_broadcaster.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.websocket("/api/v1/ws/health")
+async def websocket_health_scores(websocket: WebSocket, vaults: Optional[str] = None):
+    """WebSocket feed of score updates; same filter semantics as the SSE stream"""
+    try:
+        vault_ids = parse_vault_filter(vaults)
+    except ValueError:
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    subscriber = score_broadcaster.subscribe(vault_ids)
+    # Watch for the client closing while we are blocked waiting for updates
+    receiver = asyncio.create_task(websocket.receive())
+    getter = None
+    try:
+        while True:
+            if getter is None:
+                getter = asyncio.create_task(subscriber.queue.get())
+            done, _ = await asyncio.wait(
+                {getter, receiver}, timeout=PUSH_HEARTBEAT_SECONDS, return_when=asyncio.FIRST_COMPLETED
+            )
+            if receiver in done:
+                if receiver.result().get("type") == "websocket.disconnect":
+                    break
+                receiver = asyncio.create_task(websocket.receive())  # client chatter is ignored
+            if getter not in done:
+                if not done:
+                    await websocket.send_text('{"type": "keepalive"}')
+                continue
+            message = getter.result()
+            getter = None
+            if message is EVICTED:
+                await websocket.close(code=1013, reason="slow consumer")
+                break
+            await websocket.send_text(message)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        if getter is not None:
+            getter.cancel()
+        score_broadcaster.unsubscribe(subscriber)
+
+
+@app.post("/api/v1/vaults/{vault_id}/assess", response_model=HealthScore, dependencies=[Depends(require_schema)])
 async def assess_vault_risk(
     vault_id: int,
     request: RiskAssessmentRequest,
     background_tasks: BackgroundTasks
 ):
     """Trigger a risk assessment for a vault"""
-    
+    global pending_publishes
+
     try:
-        # Step 1: Ingest data
-        logger.info(f"Ingesting data for vault {vault_id}")
-        vault_data = await ingestion_agent.fetch_vault_data(
-            vault_id=vault_id,
-            owner_address=request.vault_owner
-        )
-        
-        # Step 2: Run risk modeling
-        logger.info(f"Running risk model for vault {vault_id}")
-        risk_assessment = await modeling_engine.calculate_health_score(vault_data)
-        
-        # Step 3: Store result (Postgres)
-        session = get_session()
-        try:
-            rec = session.query(HealthScoreModel).filter(HealthScoreModel.vault_id == vault_id).first()
-            now_ts = datetime.now()
-            if rec is None:
-                rec = HealthScoreModel(
-                    vault_id=vault_id,
-                    score=risk_assessment["score"],
-                    risk_factors=risk_assessment["risk_factors"],
-                    timestamp=now_ts,
-                )
-                session.add(rec)
-            else:
-                rec.score = risk_assessment["score"]
-                rec.risk_factors = risk_assessment["risk_factors"]
-                rec.timestamp = now_ts
-            session.commit()
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            session.close()
+        risk_assessment = await run_assessment(vault_id, request.vault_owner)
         
         # Step 4: Schedule background task to publish on-chain
+        pending_publishes += 1
         background_tasks.add_task(
-            oracle_publisher.publish_health_score,
+            publish_in_background,
             request.vault_owner,
             risk_assessment["score"],
-            risk_assessment["risk_factors"]
+            risk_assessment["risk_factors"],
+            tracer.current_span()
         )
         
         return HealthScore(
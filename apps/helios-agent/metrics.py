@@ -0,0 +1,257 @@
+"""
+Prometheus metrics for Helios Risk Oracle
+Minimal in-process histograms, counters and gauges rendered in the Prometheus text format.
+Observations are a bisect plus two additions, so they are cheap enough for the hot path.
+"""
+
+import time
+import asyncio
+import logging
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry: List["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(value: str) -> str:
+    """HELP text escapes backslash and newline only (quotes stay literal)"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        _registry.append(self)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {_escape_help(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Counter incremented directly, or read at scrape time from a running total kept
+    elsewhere (the collector must only ever return non-decreasing values)"""
+
+    kind = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        collector: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._collectors: List[Callable[[], Dict[LabelValues, float]]] = [collector] if collector else []
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def add_collector(self, collector: Callable[[], Dict[LabelValues, float]]) -> None:
+        self._collectors.append(collector)
+
+    def samples(self) -> List[str]:
+        values = dict(self._values)
+        for collector in self._collectors:
+            try:
+                values.update(collector())
+            except Exception as e:
+                logger.debug(f"Counter collector for {self.name} failed: {e}")
+        return [f"{self.name}{_labels(self.labelnames, lv)} {_fmt(v)}" for lv, v in values.items()]
+
+
+class Gauge(_Metric):
+    """Gauge set directly, or computed at scrape time by a collector callback"""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        collector: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._collectors: List[Callable[[], Dict[LabelValues, float]]] = [collector] if collector else []
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        self._values[labelvalues] = value
+
+    def add_collector(self, collector: Callable[[], Dict[LabelValues, float]]) -> None:
+        self._collectors.append(collector)
+
+    def samples(self) -> List[str]:
+        values = dict(self._values)
+        for collector in self._collectors:
+            try:
+                values.update(collector())
+            except Exception as e:
+                logger.debug(f"Gauge collector for {self.name} failed: {e}")
+        return [f"{self.name}{_labels(self.labelnames, lv)} {_fmt(v)}" for lv, v in values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        series = self._series.get(labelvalues)
+        if series is None:
+            series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def samples(self) -> List[str]:
+        lines = []
+        for lv, (counts, total) in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, lv, ('le', _fmt(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, lv)} {_fmt(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, lv)} {cumulative}")
+        return lines
+
+
+def render() -> str:
+    """All registered metrics in Prometheus text exposition format (0.0.4)"""
+    return "\n".join(metric.render() for metric in _registry) + "\n"
+
+
+# ---- Helios metrics ----
+
+STAGE_SECONDS = Histogram(
+    "helios_stage_duration_seconds",
+    "Duration of assess pipeline stages",
+    ("stage",),
+)
+MOCK_FALLBACKS = Counter(
+    "helios_mock_fallback_total",
+    "Times a data source fell back to mock data",
+    ("source",),
+)
+EVENT_LOOP_LAG = Gauge(
+    "helios_event_loop_lag_seconds",
+    "Scheduling delay of the asyncio event loop",
+)
+DB_POOL = Gauge(
+    "helios_db_pool_connections",
+    "SQLAlchemy connection pool usage",
+    ("state",),
+)
+QUEUE_DEPTH = Gauge(
+    "helios_background_queue_depth",
+    "Items waiting in background queues",
+    ("queue",),
+)
+UPSTREAM = Gauge(
+    "helios_upstream_limiter",
+    "Upstream rate limiter state",
+    ("upstream", "field"),
+)
+RECONCILE_VAULTS = Counter(
+    "helios_reconcile_vaults_total",
+    "Vaults checked by on-chain reconciliation, by outcome",
+    ("outcome",),
+)
+RECONCILE_REPUBLISHED = Counter(
+    "helios_reconcile_republished_total",
+    "On-chain publishes submitted by reconciliation for drifted vaults",
+)
+RECONCILE_PASS = Gauge(
+    "helios_reconcile_pass",
+    "Progress and throughput of the latest reconciliation pass",
+    ("field",),
+)
+SNAPSHOT = Gauge(
+    "helios_snapshot",
+    "Memory-mapped score snapshot state",
+    ("field",),
+)
+SNAPSHOT_LOOKUPS = Counter(
+    "helios_snapshot_lookups_total",
+    "Health score lookups served from the memory-mapped snapshot, by result",
+    ("result",),
+)
+PUSH = Gauge(
+    "helios_push",
+    "Live score push subscribers and LISTEN connection state",
+    ("field",),
+)
+PUSH_DELIVERED = Counter(
+    "helios_push_delivered_total",
+    "Score updates delivered to live push subscribers",
+)
+PUSH_EVICTED = Counter(
+    "helios_push_evicted_total",
+    "Live push subscribers dropped for falling behind",
+)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """Record the wall time of the enclosed block under helios_stage_duration_seconds{stage=...}
+    (and as a trace span when the current request is sampled)"""
+    start = time.perf_counter()
+    try:
+        with tracer.span(stage):
+            yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage)
+
+
+async def monitor_event_loop_lag(interval: float = 0.5) -> None:
+    """Measure how late a sleep wakes up; that overshoot is the loop's scheduling lag"""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.set(max(0.0, loop.time() - start - interval))
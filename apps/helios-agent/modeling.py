@@ -3,16 +3,30 @@ Risk Modeling Engine for Helios Oracle
 Implements sophisticated risk assessment algorithms for RWA vaults
 """
 
-import numpy as np
 from typing import Dict, List, Optional
 from datetime import datetime
 import logging
 import asyncio
 
+from metrics import MOCK_FALLBACKS
+from exposure import ExposureIndex
+
 logger = logging.getLogger(__name__)
 
+# Keys of the risk_factors dict every assessment produces (exports have one column each)
+RISK_FACTORS = (
+    "asset_diversity",
+    "ltv_ratio",
+    "originator_reputation",
+    "market_conditions",
+    "concentration_risk",
+)
+
 class RiskModelingEngine:
-    def __init__(self):
+    def __init__(self, exposure_index: Optional[ExposureIndex] = None):
+        # Cross-vault originator / asset-type exposure, updated from each assessed composition
+        self.exposure_index = exposure_index or ExposureIndex.from_env()
+
         # Weights for the comprehensive risk model
         self.weights = {
             "asset_diversity": 0.20,
@@ -44,13 +58,15 @@ class RiskModelingEngine:
             ltv_score = self._calculate_ltv_score(off_chain)
             reputation_score = self._calculate_reputation_score(off_chain)
             market_score = self._calculate_market_score(off_chain)
+            concentration_score = self._calculate_concentration_score(vault_data, composition)
             
             # Weighted average calculation
             weighted_scores = {
                 "asset_diversity": diversity_score * self.weights["asset_diversity"],
                 "ltv_ratio": ltv_score * self.weights["ltv_ratio"],
                 "originator_reputation": reputation_score * self.weights["originator_reputation"],
-                "market_conditions": market_score * self.weights["market_conditions"]
+                "market_conditions": market_score * self.weights["market_conditions"],
+                "concentration_risk": concentration_score * self.weights["concentration_risk"]
             }
             
             # Calculate final score
@@ -66,7 +82,8 @@ class RiskModelingEngine:
                     "asset_diversity": int(diversity_score),
                     "ltv_ratio": int(ltv_score),
                     "originator_reputation": int(reputation_score),
-                    "market_conditions": int(market_score)
+                    "market_conditions": int(market_score),
+                    "concentration_risk": int(concentration_score)
                 },
                 "risk_level": risk_level,
                 "recommendation": self._generate_recommendation(final_score, risk_level),
@@ -75,14 +92,10 @@ class RiskModelingEngine:
             
         except Exception as e:
             logger.error(f"Error calculating health score: {str(e)}")
+            MOCK_FALLBACKS.inc("model")
             return {
                 "score": 50,
-                "risk_factors": {
-                    "asset_diversity": 50,
-                    "ltv_ratio": 50,
-                    "originator_reputation": 50,
-                    "market_conditions": 50
-                },
+                "risk_factors": {name: 50 for name in RISK_FACTORS},
                 "risk_level": "MEDIUM",
                 "recommendation": "Unable to calculate precise score",
                 "error": str(e)
@@ -141,6 +154,20 @@ class RiskModelingEngine:
         
         return min(100, max(0, score))
     
+    def _calculate_concentration_score(self, vault_data: Dict, composition: Dict) -> float:
+        """Calculate concentration score from the cross-vault exposure index"""
+        vault_id = vault_data.get("vault_id", composition.get("vault_id"))
+        # Placeholder compositions would index the same fake holdings for every vault
+        if vault_id is None or composition.get("mock"):
+            return 50.0
+        self.exposure_index.update_vault(
+            int(vault_id),
+            vault_data.get("owner_address", ""),
+            composition.get("assets", [])
+        )
+        score = self.exposure_index.concentration_score(int(vault_id))
+        return 50.0 if score is None else float(score)
+    
     def _determine_risk_level(self, score: int) -> str:
         """Determine risk level based on score"""
         if score >= self.thresholds["low_risk"]:
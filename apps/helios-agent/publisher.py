@@ -6,27 +6,54 @@ Falls back to simulated mode if SDK is unavailable or no private key is provided
 
 import os
 import logging
+from contextlib import asynccontextmanager
 from typing import Dict, Optional, List
 from dotenv import load_dotenv
 import asyncio
 
+from endpoints import get_fullnode_pool
+from metrics import stage_timer, MOCK_FALLBACKS
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
 class OraclePublisher:
     def __init__(self):
-        self.node_url = os.getenv("APTOS_NODE_URL", "https://fullnode.testnet.aptoslabs.com/v1")
+        self.fullnode_pool = get_fullnode_pool()
+        self.node_url = self.fullnode_pool.best_url()
         self.module_address = os.getenv("STRATAFI_ADDR", "0x1234567890abcdef1234567890abcdef1234567890abcdef1234567890abcdef")
         self._sdk_available = False
         self._use_async = False
         self.client = None
+        # Publishes in flight per client; a replaced client is closed when its last one ends
+        self._client_users: Dict[int, int] = {}
+        self._retired_clients: Dict[int, object] = {}
+        self.switch_ratio = float(os.getenv("HELIOS_PUBLISH_SWITCH_RATIO", 2.0))
+        self._RestClient = None
         self.Account = None
         self.EntryFunction = None
         self.TransactionArgument = None
         self.TransactionPayload = None
         self.AccountAddress = None
+        self.account = None
+
+        # The SDK import is deferred to ensure_sdk() to keep process start fast
+        self._sdk_loaded = False
+        self._sdk_lock: Optional[asyncio.Lock] = None
+
+    async def ensure_sdk(self) -> None:
+        """Import the Aptos SDK and load the signing account on first use (off the event loop)"""
+        if self._sdk_loaded:
+            return
+        if self._sdk_lock is None:
+            self._sdk_lock = asyncio.Lock()
+        async with self._sdk_lock:
+            if not self._sdk_loaded:
+                await asyncio.to_thread(self._load_sdk)
+                self._sdk_loaded = True
 
+    def _load_sdk(self) -> None:
         # Attempt to import Aptos SDK lazily (prefer async client)
         try:
             from aptos_sdk.account import Account as _Account
@@ -36,12 +63,13 @@ class OraclePublisher:
             # Try async client first
             try:
                 from aptos_sdk.async_client import RestClient as _AsyncRestClient
-                self.client = _AsyncRestClient(self.node_url)
+                self._RestClient = _AsyncRestClient
                 self._use_async = True
             except Exception:
                 from aptos_sdk.client import RestClient as _RestClient
-                self.client = _RestClient(self.node_url)
+                self._RestClient = _RestClient
                 self._use_async = False
+            self.client = self._RestClient(self.node_url)
 
             self.Account = _Account
             self.EntryFunction = _EntryFunction
@@ -70,19 +98,55 @@ class OraclePublisher:
             except Exception as e:
                 logger.error(f"Failed to load private key: {str(e)}")
                 self.account = None
-    
+
+    def _refresh_client(self) -> None:
+        """Move the SDK client to another fullnode only if the current one is ejected or
+        clearly worse (score above switch_ratio x best), so load jitter does not flap it"""
+        if not self._sdk_available:
+            return
+        best_url = self.fullnode_pool.preferred_url(self.node_url, self.switch_ratio)
+        if best_url == self.node_url:
+            return
+        old_client = self.client
+        self.client = self._RestClient(best_url)
+        self.node_url = best_url
+        logger.info(f"Publisher switched to fullnode {best_url}")
+        if self._use_async and old_client is not None:
+            self._retired_clients[id(old_client)] = old_client
+            if not self._client_users.get(id(old_client)):
+                asyncio.get_running_loop().create_task(self._close_client(old_client))
+
+    async def _close_client(self, client) -> None:
+        self._retired_clients.pop(id(client), None)
+        self._client_users.pop(id(client), None)
+        try:
+            await client.close()
+        except Exception:
+            pass
+
+    @asynccontextmanager
+    async def _lease_client(self):
+        """The current client, kept open until this transaction finishes even if replaced"""
+        self._refresh_client()
+        client = self.client
+        key = id(client)
+        self._client_users[key] = self._client_users.get(key, 0) + 1
+        try:
+            yield client
+        finally:
+            self._client_users[key] -= 1
+            if not self._client_users[key] and key in self._retired_clients:
+                await self._close_client(client)
+
     async def check_aptos_connection(self) -> bool:
         """Check if Aptos node is accessible"""
+        await self.ensure_sdk()
         if not self._sdk_available or not self.client:
             return False
         try:
-            if self._use_async:
-                # chain_id is a simple readiness check
-                cid = await self.client.chain_id()
-                return cid is not None
-            else:
-                ledger_info = self.client.ledger_info()
-                return ledger_info is not None
+            # Ledger info via the health-scored pool is a simple readiness check
+            ledger_info = await self.fullnode_pool.get("/", timeout=5)
+            return ledger_info.get("chain_id") is not None
         except Exception:
             return False
     
@@ -95,8 +159,10 @@ class OraclePublisher:
         """
         Publish health score on-chain
         """
+        await self.ensure_sdk()
         if not self.account or not self._sdk_available or not self.client:
             logger.warning("No account configured - simulating on-chain publication")
+            MOCK_FALLBACKS.inc("publish")
             return {
                 "status": "simulated",
                 "vault_owner": vault_owner,
@@ -136,17 +202,22 @@ class OraclePublisher:
             
             # Create and submit transaction
             payload = self.TransactionPayload(entry_function)
-            if self._use_async:
-                signed_txn = await self.client.create_bcs_transaction(self.account, payload)
-                tx_hash = await self.client.submit_bcs_transaction(signed_txn)
-                await self.client.wait_for_transaction(tx_hash)
-                # Fetch result for details
-                result = await self.client.transaction_by_hash(tx_hash)
-            else:
-                signed_txn = self.client.create_bcs_transaction(self.account, payload)
-                tx_hash = self.client.submit_bcs_transaction(signed_txn)
-                result = self.client.wait_for_transaction(tx_hash)
-            
+            async with self._lease_client() as client:
+                if self._use_async:
+                    with stage_timer("publish.submit"):
+                        signed_txn = await client.create_bcs_transaction(self.account, payload)
+                        tx_hash = await client.submit_bcs_transaction(signed_txn)
+                    with stage_timer("publish.confirm"):
+                        await client.wait_for_transaction(tx_hash)
+                        # Fetch result for details
+                        result = await client.transaction_by_hash(tx_hash)
+                else:
+                    with stage_timer("publish.submit"):
+                        signed_txn = client.create_bcs_transaction(self.account, payload)
+                        tx_hash = client.submit_bcs_transaction(signed_txn)
+                    with stage_timer("publish.confirm"):
+                        result = client.wait_for_transaction(tx_hash)
+
             logger.info(f"Successfully published health score on-chain: {tx_hash}")
             
             return {
@@ -171,6 +242,7 @@ class OraclePublisher:
         """
         Initialize the oracle for a new vault
         """
+        await self.ensure_sdk()
         if not self.account:
             return {
                 "status": "simulated",
@@ -193,14 +265,15 @@ class OraclePublisher:
             )
             
             payload = self.TransactionPayload(entry_function)
-            if self._use_async:
-                signed_txn = await self.client.create_bcs_transaction(self.account, payload)
-                tx_hash = await self.client.submit_bcs_transaction(signed_txn)
-                await self.client.wait_for_transaction(tx_hash)
-            else:
-                signed_txn = self.client.create_bcs_transaction(self.account, payload)
-                tx_hash = self.client.submit_bcs_transaction(signed_txn)
-                result = self.client.wait_for_transaction(tx_hash)
+            async with self._lease_client() as client:
+                if self._use_async:
+                    signed_txn = await client.create_bcs_transaction(self.account, payload)
+                    tx_hash = await client.submit_bcs_transaction(signed_txn)
+                    await client.wait_for_transaction(tx_hash)
+                else:
+                    signed_txn = client.create_bcs_transaction(self.account, payload)
+                    tx_hash = client.submit_bcs_transaction(signed_txn)
+                    result = client.wait_for_transaction(tx_hash)
             
             return {
                 "status": "success",
@@ -0,0 +1,216 @@
+"""
+Push delivery of health score updates for Helios Risk Oracle
+Clients subscribe (SSE or WebSocket) to specific vault IDs or the whole fleet and receive
+each score the moment it is persisted. Every subscriber has a bounded queue; one that falls
+behind is evicted instead of slowing the broadcast. Replicas share updates through
+Postgres LISTEN/NOTIFY.
+"""
+
+import os
+import json
+import time
+import select
+import asyncio
+import logging
+import threading
+from typing import Callable, Dict, Iterable, Optional, Set
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "helios_scores"
+
+# Queue sentinel telling a consumer it was evicted for falling behind
+EVICTED = None
+
+
+class Subscriber:
+    def __init__(self, vault_ids: Optional[Set[int]], queue_size: int):
+        self.vault_ids = vault_ids  # None means the whole fleet
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.evicted = False
+
+
+class ScoreBroadcaster:
+    """In-process fan-out of encoded score updates, indexed by vault ID"""
+
+    def __init__(self, queue_size: int = 64):
+        self.queue_size = queue_size
+        self.replica_id = os.urandom(8).hex()
+        self._fleet: Set[Subscriber] = set()
+        self._by_vault: Dict[int, Set[Subscriber]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.delivered_total = 0
+        self.evicted_total = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._fleet) + len({s for subs in self._by_vault.values() for s in subs})
+
+    def subscribe(self, vault_ids: Optional[Iterable[int]] = None) -> Subscriber:
+        self._loop = asyncio.get_running_loop()
+        ids = set(vault_ids) if vault_ids else None
+        sub = Subscriber(ids, self.queue_size)
+        if ids is None:
+            self._fleet.add(sub)
+        else:
+            for vault_id in ids:
+                self._by_vault.setdefault(vault_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        if sub.vault_ids is None:
+            self._fleet.discard(sub)
+            return
+        for vault_id in sub.vault_ids:
+            subs = self._by_vault.get(vault_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._by_vault[vault_id]
+
+    def _evict(self, sub: Subscriber) -> None:
+        sub.evicted = True
+        self.evicted_total += 1
+        self.unsubscribe(sub)
+        # Make room for the sentinel so the consumer wakes up and closes
+        try:
+            sub.queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        sub.queue.put_nowait(EVICTED)
+
+    def publish_encoded(self, vault_id: int, message: str) -> int:
+        """Deliver a pre-encoded JSON message to fleet and per-vault subscribers"""
+        targets = list(self._fleet)
+        targets.extend(self._by_vault.get(vault_id, ()))
+        delivered = 0
+        for sub in targets:
+            try:
+                sub.queue.put_nowait(message)
+                delivered += 1
+            except asyncio.QueueFull:
+                logger.info(f"Evicting slow score subscriber (vault filter: {sub.vault_ids})")
+                self._evict(sub)
+        self.delivered_total += delivered
+        return delivered
+
+    def publish_threadsafe(self, vault_id: int, message: str) -> None:
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self.publish_encoded, vault_id, message)
+
+
+def notify_payload(broadcaster: ScoreBroadcaster, message: str) -> str:
+    """NOTIFY payload: origin replica plus the encoded update (well under the 8000-byte limit)"""
+    return json.dumps({"origin": broadcaster.replica_id, "message": message})
+
+
+class PgNotifyBridge:
+    """LISTENs on the score channel in a daemon thread and relays other replicas' updates"""
+
+    def __init__(
+        self,
+        engine,
+        broadcaster: ScoreBroadcaster,
+        on_remote: Optional[Callable[[Dict], None]] = None,
+        on_reconnect: Optional[Callable[[float], None]] = None,
+    ):
+        self.engine = engine
+        self.broadcaster = broadcaster
+        self.on_remote = on_remote  # called in the listener thread with each decoded remote update
+        # Called in the listener thread once LISTEN is re-established, with the time.time() the
+        # connection was lost, so the caller can catch up on notifications it missed
+        self.on_reconnect = on_reconnect
+        self._disconnected_at: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.connected = False
+
+    def start(self) -> None:
+        if self.engine.dialect.name != "postgresql":
+            logger.info("Score push: not on Postgres, cross-replica delivery disabled")
+            return
+        # Bind the broadcaster to the serving loop before any notification arrives
+        self.broadcaster._loop = asyncio.get_running_loop()
+        self._thread = threading.Thread(target=self._run, name="helios-pg-listen", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _connect(self):
+        """A dedicated DBAPI connection made the way the pool would, but never checked out
+        of it, so holding it for the life of the process costs the pool nothing"""
+        cargs, cparams = self.engine.dialect.create_connect_args(self.engine.url)
+        return self.engine.dialect.connect(*cargs, **cparams)
+
+    def _run(self) -> None:
+        delay = 1.0
+        while not self._stop.is_set():
+            dbapi_conn = None
+            try:
+                dbapi_conn = self._connect()
+                dbapi_conn.autocommit = True
+                with dbapi_conn.cursor() as cur:
+                    cur.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                self.connected = True
+                delay = 1.0
+                if self._disconnected_at is not None:
+                    self._catch_up(self._disconnected_at)
+                    self._disconnected_at = None
+                while not self._stop.is_set():
+                    if select.select([dbapi_conn], [], [], 5.0) == ([], [], []):
+                        continue
+                    dbapi_conn.poll()
+                    while dbapi_conn.notifies:
+                        self._relay(dbapi_conn.notifies.pop(0).payload)
+            except Exception as e:
+                if self._disconnected_at is None:
+                    self._disconnected_at = time.time()
+                self.connected = False
+                logger.warning(f"Score LISTEN connection lost, retrying in {delay:.0f}s: {e}")
+                time.sleep(delay)
+                delay = min(30.0, delay * 2)
+            finally:
+                self.connected = False
+                if dbapi_conn is not None:
+                    try:
+                        dbapi_conn.close()
+                    except Exception:
+                        pass
+
+    def _catch_up(self, disconnected_at: float) -> None:
+        if self.on_reconnect is None:
+            return
+        try:
+            self.on_reconnect(disconnected_at)
+        except Exception as e:
+            logger.warning(f"Catch-up after LISTEN reconnect failed: {e}")
+
+    def _relay(self, payload: str) -> None:
+        try:
+            envelope = json.loads(payload)
+            if envelope.get("origin") == self.broadcaster.replica_id:
+                return  # already delivered locally
+            message = envelope["message"]
+            update = json.loads(message)
+            vault_id = int(update["vault_id"])
+        except Exception as e:
+            logger.debug(f"Ignoring malformed score notification: {e}")
+            return
+        if self.on_remote is not None:
+            try:
+                self.on_remote(update)
+            except Exception as e:
+                logger.warning(f"Remote score hook failed for vault {vault_id}: {e}")
+        self.broadcaster.publish_threadsafe(vault_id, message)
+
+
+def parse_vault_filter(value: Optional[str]) -> Optional[Set[int]]:
+    """`?vaults=1,2,3` -> {1, 2, 3}; missing or empty means the whole fleet"""
+    if not value:
+        return None
+    return {int(v) for v in value.split(",") if v.strip()}
@@ -0,0 +1,265 @@
+"""
+Upstream rate limiting for Helios Risk Oracle
+Combines a token bucket (requests/second) with AIMD adaptive concurrency per upstream.
+429 and 5xx responses shrink the concurrency window and honour Retry-After; successes grow it back.
+Interactive requests (/assess) are dispatched ahead of background traffic.
+Each worker thread gets its own requests.Session, since sessions are not thread-safe.
+"""
+
+import os
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, List, Optional, Tuple
+
+import requests
+
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+OUTCOME_OK = "ok"
+OUTCOME_THROTTLED = "throttled"
+OUTCOME_ERROR = "error"
+
+_current_priority: contextvars.ContextVar = contextvars.ContextVar(
+    "helios_request_priority", default=PRIORITY_BACKGROUND
+)
+
+
+def current_priority() -> int:
+    """Priority of the upstream calls made from the current task"""
+    return _current_priority.get()
+
+
+@contextmanager
+def request_priority(priority: int):
+    """Run the enclosed upstream calls in the given priority lane"""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except Exception:
+        return None
+
+
+class UpstreamThrottled(requests.HTTPError):
+    """An upstream still answered 429 after the limiter ran out of retries"""
+
+
+class UpstreamLimiter:
+    """Token bucket + AIMD concurrency limiter for a single upstream (Nodit, a fullnode, ...)"""
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: Optional[float] = None,
+        initial_concurrency: int = 4,
+        min_concurrency: int = 1,
+        max_concurrency: int = 32,
+        decrease_factor: float = 0.5,
+        decrease_cooldown: float = 1.0,
+        max_retries: int = 3,
+    ):
+        self.name = name
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self.max_retries = max_retries
+
+        self._tokens = self.burst
+        self._last_refill = time.monotonic()
+        self._limit = float(max(min_concurrency, min(initial_concurrency, max_concurrency)))
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._local = threading.local()
+
+        # Counters for status/metrics
+        self.throttled_total = 0
+        self.errors_total = 0
+        self.exhausted_total = 0  # requests that gave up while still throttled
+
+    @classmethod
+    def from_env(cls, prefix: str, rate: float, burst: Optional[float] = None, max_concurrency: int = 32) -> "UpstreamLimiter":
+        """Build a limiter from <PREFIX>_RATE_LIMIT, <PREFIX>_BURST and <PREFIX>_MAX_CONCURRENCY"""
+        rate = float(os.getenv(f"{prefix}_RATE_LIMIT", rate))
+        burst_env = os.getenv(f"{prefix}_BURST")
+        max_concurrency = int(os.getenv(f"{prefix}_MAX_CONCURRENCY", max_concurrency))
+        return cls(
+            prefix.lower(),
+            rate=rate,
+            burst=float(burst_env) if burst_env else burst,
+            max_concurrency=max_concurrency,
+        )
+
+    @property
+    def concurrency_limit(self) -> int:
+        return int(self._limit)
+
+    def _send(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Runs in a to_thread worker, on that thread's own session"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session.request(method, url, **kwargs)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, fut in self._waiters if not fut.done())
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._last_refill = now
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._timer = loop.call_later(max(0.0, delay), self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant slots to waiters in priority order while tokens and concurrency allow"""
+        now = time.monotonic()
+        self._refill(now)
+        while self._waiters:
+            _, _, fut = self._waiters[0]
+            if fut.done():
+                heapq.heappop(self._waiters)
+                continue
+            if now < self._paused_until:
+                self._schedule(self._paused_until - now)
+                return
+            if self._in_flight >= int(self._limit):
+                # release() re-dispatches when a slot frees up
+                return
+            if self._tokens < 1.0:
+                self._schedule((1.0 - self._tokens) / self.rate)
+                return
+            heapq.heappop(self._waiters)
+            self._tokens -= 1.0
+            self._in_flight += 1
+            fut.set_result(None)
+
+    async def acquire(self, priority: Optional[int] = None) -> None:
+        """Wait for a token and a concurrency slot"""
+        if priority is None:
+            priority = current_priority()
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        self._dispatch()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Slot was granted just before cancellation; hand it back
+                self._in_flight -= 1
+                self._dispatch()
+            raise
+
+    def release(self, outcome: str = OUTCOME_OK, retry_after: Optional[float] = None) -> None:
+        """Return a slot and feed the response outcome into the AIMD controller"""
+        self._in_flight = max(0, self._in_flight - 1)
+        now = time.monotonic()
+        if outcome == OUTCOME_OK:
+            # Additive increase: roughly +1 per window's worth of successes
+            self._limit = min(float(self.max_concurrency), self._limit + 1.0 / self._limit)
+        else:
+            if outcome == OUTCOME_THROTTLED:
+                self.throttled_total += 1
+                # Stop drawing from the bucket until it refills
+                self._tokens = min(self._tokens, 0.0)
+            else:
+                self.errors_total += 1
+            if now - self._last_decrease >= self.decrease_cooldown:
+                self._limit = max(float(self.min_concurrency), self._limit * self.decrease_factor)
+                self._last_decrease = now
+                logger.info(f"{self.name}: backing off to concurrency {int(self._limit)} after {outcome} response")
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+        self._dispatch()
+
+    async def request(self, method: str, url: str, max_retries: Optional[int] = None, **kwargs: Any) -> requests.Response:
+        """
+        Perform an HTTP request under this limiter.
+        429 and 5xx responses are retried (up to max_retries) after the limiter has backed off.
+        If retries run out on a 429, UpstreamThrottled is raised (with the response); on a
+        5xx the last response is returned for the caller to check.
+        """
+        if max_retries is None:
+            max_retries = self.max_retries
+        priority = current_priority()
+        attempt = 0
+        while True:
+            await self.acquire(priority)
+            outcome = OUTCOME_ERROR
+            retry_after = None
+            try:
+                with tracer.span(f"http {method}", **{"http.url": url, "upstream": self.name}) as span:
+                    resp = await asyncio.to_thread(self._send, method, url, **kwargs)
+                    if span is not None:
+                        span.set_attribute("http.status_code", resp.status_code)
+                if resp.status_code == 429:
+                    outcome = OUTCOME_THROTTLED
+                    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                elif resp.status_code >= 500:
+                    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                else:
+                    outcome = OUTCOME_OK
+            finally:
+                self.release(outcome, retry_after)
+
+            if outcome == OUTCOME_THROTTLED and attempt >= max_retries:
+                self.exhausted_total += 1
+                raise UpstreamThrottled(
+                    f"{self.name}: still throttled after {attempt + 1} attempt(s)", response=resp
+                )
+            if outcome == OUTCOME_OK or attempt >= max_retries:
+                return resp
+            attempt += 1
+            if retry_after is None:
+                # Throttled waits are handled by the bucket; 5xx gets a short exponential backoff
+                await asyncio.sleep(0.0 if outcome == OUTCOME_THROTTLED else min(4.0, 0.25 * 2 ** attempt))
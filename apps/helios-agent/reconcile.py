@@ -0,0 +1,319 @@
+"""
+On-chain / off-chain score reconciliation for Helios Risk Oracle
+Walks agent_health_scores in vault_id order, one keyset page at a time. For each page it
+reads the oracle state of every vault concurrently through the fullnode pool, merges the
+two vault_id-sorted lists, and re-queues a publish for each vault whose on-chain score or
+risk factors differ from the database (for example after a dropped background publish).
+
+risk_oracle::get_score and get_risk_factors are plain `public fun`s, not #[view], so they
+cannot be called over REST. The job reads the HealthScore resource they return fields from
+(`/accounts/{owner}/resource/{module}::risk_oracle::HealthScore`) instead. Only the score
+and the four factors stored on-chain are compared.
+
+Rows scored within the grace period are skipped, because their own background publish is
+normally still in flight. Vaults already queued for republish are not queued again.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import requests
+from dotenv import load_dotenv
+
+from db import get_session, HealthScoreModel, VaultRegistryModel
+from endpoints import get_fullnode_pool
+from metrics import stage_timer, RECONCILE_VAULTS, RECONCILE_PASS, RECONCILE_REPUBLISHED
+from ratelimit import request_priority, PRIORITY_BACKGROUND
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Risk factors the oracle stores on-chain (see risk_oracle::RiskFactors)
+ONCHAIN_FACTORS = ("asset_diversity", "ltv_ratio", "originator_reputation", "market_conditions")
+
+OUTCOME_MATCH = "match"
+OUTCOME_DRIFT = "drift"
+OUTCOME_UNINITIALIZED = "uninitialized"  # no HealthScore resource at the owner
+OUTCOME_MISMATCHED_VAULT = "mismatched_vault"  # the owner's oracle tracks a different vault
+OUTCOME_ERROR = "error"
+OUTCOME_PENDING = "pending"  # scored within the grace period or already queued for republish
+
+PublishCallback = Callable[[int, str, int, Dict], Awaitable[Optional[Dict]]]
+DbRow = Tuple[int, str, int, Dict, Optional[datetime]]
+
+
+class ScoreReconciler:
+    def __init__(
+        self,
+        publish: PublishCallback,
+        module_address: Optional[str] = None,
+        page_size: int = 500,
+        concurrency: int = 32,
+        publish_concurrency: int = 4,
+        score_tolerance: int = 0,
+        interval_seconds: float = 0.0,
+        grace_seconds: float = 120.0,
+    ):
+        self.publish = publish
+        self.module_address = module_address or os.getenv(
+            "STRATAFI_ADDR", "0x1234567890abcdef1234567890abcdef1234567890abcdef1234567890abcdef"
+        )
+        self.page_size = page_size
+        self.score_tolerance = score_tolerance
+        self.interval_seconds = interval_seconds
+        self.grace_seconds = grace_seconds
+        self.publish_concurrency = publish_concurrency
+        self.fullnode_pool = get_fullnode_pool()
+        self._read_semaphore = asyncio.Semaphore(concurrency)
+        self.publish_queue: asyncio.Queue = asyncio.Queue()
+        self._queued: Set[int] = set()  # vault_ids in publish_queue or being published
+        self._workers: List[asyncio.Task] = []
+        self._loop_task: Optional[asyncio.Task] = None
+        self._pass_task: Optional[asyncio.Task] = None
+        # Resume point: last vault_id of the last completed page
+        self.cursor = -1
+        self.last_pass: Dict[str, Any] = {}
+        self.current_pass: Dict[str, Any] = {}
+        # Why the most recent pass failed; cleared by the next pass that completes
+        self.last_error: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_env(cls, publish: PublishCallback) -> "ScoreReconciler":
+        return cls(
+            publish,
+            page_size=int(os.getenv("HELIOS_RECONCILE_PAGE_SIZE", 500)),
+            concurrency=int(os.getenv("HELIOS_RECONCILE_CONCURRENCY", 32)),
+            score_tolerance=int(os.getenv("HELIOS_RECONCILE_SCORE_TOLERANCE", 0)),
+            interval_seconds=float(os.getenv("HELIOS_RECONCILE_INTERVAL_SECONDS", 0)),
+            grace_seconds=float(os.getenv("HELIOS_RECONCILE_GRACE_SECONDS", 120)),
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._pass_task is not None and not self._pass_task.done()
+
+    def start(self) -> None:
+        """Start publish workers, and the periodic pass loop if an interval is configured"""
+        loop = asyncio.get_running_loop()
+        if not self._workers:
+            self._workers = [loop.create_task(self._publish_worker()) for _ in range(self.publish_concurrency)]
+        if self.interval_seconds > 0 and self._loop_task is None:
+            self._loop_task = loop.create_task(self._periodic())
+            logger.info(f"Score reconciliation every {self.interval_seconds:.0f}s")
+
+    async def stop(self) -> None:
+        tasks = self._workers + [t for t in (self._loop_task, self._pass_task) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._loop_task = None
+        self._pass_task = None
+
+    def trigger(self) -> bool:
+        """Start a pass in the background; returns False if one is already running"""
+        if self.running:
+            return False
+        self.start()
+        self._start_pass()
+        return True
+
+    def _start_pass(self) -> None:
+        self._pass_task = asyncio.get_running_loop().create_task(self.run_pass())
+        self._pass_task.add_done_callback(self._on_pass_done)
+
+    def _on_pass_done(self, task: asyncio.Task) -> None:
+        """Retrieve the pass's exception so it is logged and reported, never left unretrieved"""
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is None:
+            self.last_error = None
+            return
+        logger.error(f"Reconciliation pass failed: {type(error).__name__}: {error}")
+        self.last_error = {
+            "error": f"{type(error).__name__}: {error}",
+            "failed_at": time.time(),
+            "cursor": self.cursor,  # the next pass resumes from here
+        }
+        self.current_pass = {}
+
+    async def _periodic(self) -> None:
+        while True:
+            if not self.running:
+                self._start_pass()
+            try:
+                await asyncio.shield(self._pass_task)
+            except Exception:
+                pass  # logged and recorded by _on_pass_done
+            await asyncio.sleep(self.interval_seconds)
+
+    # ---- one pass ----
+
+    async def run_pass(self) -> Dict[str, Any]:
+        """Reconcile the whole fleet page by page, resuming after an interrupted pass"""
+        started = time.perf_counter()
+        stats = {
+            "started_at": time.time(), "resumed_from": self.cursor, "pages": 0, "vaults": 0,
+            OUTCOME_MATCH: 0, OUTCOME_DRIFT: 0, OUTCOME_UNINITIALIZED: 0,
+            OUTCOME_MISMATCHED_VAULT: 0, OUTCOME_ERROR: 0, OUTCOME_PENDING: 0,
+        }
+        self.current_pass = stats
+        while True:
+            rows = await asyncio.to_thread(self._load_page, self.cursor, self.page_size)
+            if not rows:
+                break
+            with stage_timer("reconcile.page"):
+                outcomes = await self.reconcile_page(rows)
+            for outcome, count in outcomes.items():
+                stats[outcome] += count
+            stats["pages"] += 1
+            stats["vaults"] += len(rows)
+            elapsed = time.perf_counter() - started
+            stats["vaults_per_second"] = round(stats["vaults"] / elapsed, 1) if elapsed > 0 else None
+            RECONCILE_PASS.set(stats["vaults_per_second"] or 0, "vaults_per_second")
+            self.cursor = rows[-1][0]
+        self.cursor = -1
+        stats["duration_seconds"] = round(time.perf_counter() - started, 3)
+        stats["vaults_per_second"] = (
+            round(stats["vaults"] / stats["duration_seconds"], 1) if stats["duration_seconds"] > 0 else None
+        )
+        self.last_pass = stats
+        self.current_pass = {}
+        RECONCILE_PASS.set(stats["duration_seconds"], "duration_seconds")
+        RECONCILE_PASS.set(stats["vaults"], "vaults")
+        RECONCILE_PASS.set(stats["started_at"], "last_started_timestamp")
+        logger.info(
+            f"Reconciled {stats['vaults']} vaults in {stats['duration_seconds']}s "
+            f"({stats['vaults_per_second']}/s): {stats[OUTCOME_DRIFT]} drifted, "
+            f"{stats[OUTCOME_UNINITIALIZED]} uninitialized, {stats[OUTCOME_ERROR]} errors"
+        )
+        return stats
+
+    @staticmethod
+    def _load_page(after_vault_id: int, limit: int) -> List[DbRow]:
+        """Keyset page of (vault_id, owner, score, risk_factors, timestamp) ordered by vault_id"""
+        session = get_session()
+        try:
+            rows = (
+                session.query(
+                    HealthScoreModel.vault_id, VaultRegistryModel.owner_address,
+                    HealthScoreModel.score, HealthScoreModel.risk_factors, HealthScoreModel.timestamp,
+                )
+                .join(VaultRegistryModel, VaultRegistryModel.vault_id == HealthScoreModel.vault_id)
+                .filter(HealthScoreModel.vault_id > after_vault_id)
+                .order_by(HealthScoreModel.vault_id)
+                .limit(limit)
+                .all()
+            )
+            return [(r[0], r[1], r[2], r[3] or {}, r[4]) for r in rows]
+        finally:
+            session.close()
+
+    async def _read_onchain(self, owner: str) -> Tuple[str, Any]:
+        path = f"/accounts/{owner}/resource/{self.module_address}::risk_oracle::HealthScore"
+        async with self._read_semaphore:
+            try:
+                with request_priority(PRIORITY_BACKGROUND):
+                    resource = await self.fullnode_pool.get(path)
+                return owner, resource.get("data", {})
+            except requests.HTTPError as e:
+                if e.response is not None and e.response.status_code == 404:
+                    return owner, None
+                return owner, e
+            except Exception as e:
+                return owner, e
+
+    async def reconcile_page(self, rows: List[DbRow]) -> Dict[str, int]:
+        """Diff one vault_id-sorted DB page against on-chain state; queue publishes for drift"""
+        outcomes = {OUTCOME_MATCH: 0, OUTCOME_DRIFT: 0, OUTCOME_UNINITIALIZED: 0,
+                    OUTCOME_MISMATCHED_VAULT: 0, OUTCOME_ERROR: 0, OUTCOME_PENDING: 0}
+        # Recent scores usually have their own publish in flight; comparing them would
+        # only produce duplicate transactions
+        cutoff = datetime.now() - timedelta(seconds=self.grace_seconds)
+        settled = []
+        for row in rows:
+            vault_id, timestamp = row[0], row[4]
+            if vault_id in self._queued or (timestamp is not None and timestamp > cutoff):
+                outcomes[OUTCOME_PENDING] += 1
+                RECONCILE_VAULTS.inc(OUTCOME_PENDING)
+            else:
+                settled.append(row)
+        if not settled:
+            return outcomes
+
+        owners = sorted({row[1] for row in settled})
+        fetched = dict(await asyncio.gather(*(self._read_onchain(owner) for owner in owners)))
+
+        # On-chain side keyed by the vault_id the oracle itself reports, sorted for the merge
+        onchain: List[Tuple[int, Dict]] = []
+        failed_owners = set()
+        for owner, data in fetched.items():
+            if isinstance(data, Exception):
+                failed_owners.add(owner)
+            elif data is not None:
+                try:
+                    onchain.append((int(data["vault_id"]), data))
+                except (KeyError, TypeError, ValueError):
+                    failed_owners.add(owner)
+        onchain.sort(key=lambda item: item[0])
+
+        i = 0
+        for vault_id, owner, score, risk_factors, _ in settled:
+            while i < len(onchain) and onchain[i][0] < vault_id:
+                i += 1
+            if i < len(onchain) and onchain[i][0] == vault_id:
+                outcome = OUTCOME_DRIFT if self._drifted(score, risk_factors, onchain[i][1]) else OUTCOME_MATCH
+            elif owner in failed_owners:
+                outcome = OUTCOME_ERROR
+            elif fetched.get(owner) is None:
+                outcome = OUTCOME_UNINITIALIZED
+            else:
+                outcome = OUTCOME_MISMATCHED_VAULT
+            outcomes[outcome] += 1
+            RECONCILE_VAULTS.inc(outcome)
+            if outcome == OUTCOME_DRIFT:
+                self._queued.add(vault_id)
+                self.publish_queue.put_nowait((vault_id, owner, score, risk_factors))
+        return outcomes
+
+    def _drifted(self, score: int, risk_factors: Dict, onchain: Dict) -> bool:
+        try:
+            if abs(int(onchain.get("current", -1)) - int(score)) > self.score_tolerance:
+                return True
+            chain_factors = onchain.get("risk_factors") or {}
+            return any(
+                int(chain_factors.get(name, -1)) != int(risk_factors.get(name, 50))
+                for name in ONCHAIN_FACTORS
+            )
+        except (TypeError, ValueError):
+            return True
+
+    async def _publish_worker(self) -> None:
+        while True:
+            vault_id, owner, score, risk_factors = await self.publish_queue.get()
+            try:
+                result = await self.publish(vault_id, owner, score, risk_factors)
+                # Mock mode (no signing key) submits nothing, so the vault stays drifted
+                if not result or result.get("status") != "simulated":
+                    RECONCILE_REPUBLISHED.inc()
+            except Exception as e:
+                logger.error(f"Republishing vault {vault_id} after drift failed: {e}")
+            finally:
+                self._queued.discard(vault_id)
+                self.publish_queue.task_done()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "cursor": self.cursor,
+            "current_pass": self.current_pass or None,
+            "last_pass": self.last_pass or None,
+            "last_error": self.last_error,
+            "publish_queue_depth": self.publish_queue.qsize(),
+        }
@@ -0,0 +1,330 @@
+"""
+Memory-mapped score snapshot for Helios Risk Oracle
+A fixed-width binary file holding the latest score and risk factors of every vault. Every
+worker on a host maps the same file, so they share one hot copy in the page cache, and a
+restart maps the last snapshot in milliseconds instead of rebuilding from Postgres.
+
+Slots are allocated densely in first-write order, so the file grows with the number of
+vaults rather than the largest vault ID. Each process keeps a vault_id -> slot dict. It is
+rebuilt from the records on open and extended incrementally when another process appends
+slots (the header's slot count tells it how far to scan), so a lookup is a dict hit plus
+one 32-byte unpack.
+
+Writes happen in place under an exclusive flock, so only one writer runs at a time. Each
+record carries a sequence counter (odd while a write is in progress), so readers in other
+processes never take a lock and retry if they catch a torn record. A write never replaces a
+record with an older timestamp, so a rebuild that read rows before a live put() cannot
+roll the slot back.
+"""
+
+import os
+import mmap
+import time
+import fcntl
+import struct
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"HLSNAP01"
+VERSION = 2
+
+# Risk factors in slot order; new factors are appended so existing files stay readable
+FACTOR_NAMES = (
+    "asset_diversity",
+    "ltv_ratio",
+    "originator_reputation",
+    "market_conditions",
+    "payment_history",
+    "concentration_risk",
+)
+FACTOR_ABSENT = 255
+
+# magic, version, record size, capacity (slots), used slots, flags, newest timestamp in the file
+HEADER = struct.Struct("<8sIIIIId")
+HEADER_SIZE = 64
+FLAG_COMPLETE = 0x1  # every stored score has been loaded at least once
+
+# sequence, present, score, factors[6], pad, vault_id, timestamp
+RECORD = struct.Struct("<IBB6B4xqd")
+SEQ = struct.Struct("<I")
+VAULT_ID = struct.Struct("<q")
+VAULT_ID_OFFSET = 16
+TIMESTAMP = struct.Struct("<d")
+TIMESTAMP_OFFSET = 24
+
+MAX_VAULT_ID = 2 ** 63 - 1
+
+ScoreRecord = Tuple[int, Dict[str, int], datetime]
+ScoreRow = Tuple[int, int, Optional[Dict], Optional[datetime]]
+
+
+class ScoreSnapshot:
+    def __init__(self, path: str, initial_capacity: int = 1024, max_vaults: int = 1_000_000):
+        self.path = path
+        self.initial_capacity = initial_capacity
+        self.max_vaults = max_vaults
+        self._fd: Optional[int] = None
+        self._mm: Optional[mmap.mmap] = None
+        self._capacity = 0
+        self._slots: Dict[int, int] = {}
+        self._indexed = 0  # slots [0, _indexed) are in _slots
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "ScoreSnapshot":
+        return cls(
+            path=os.getenv("HELIOS_SNAPSHOT_PATH", "./data/scores.snap"),
+            initial_capacity=int(os.getenv("HELIOS_SNAPSHOT_CAPACITY", 1024)),
+            max_vaults=int(os.getenv("HELIOS_SNAPSHOT_MAX_VAULTS", 1_000_000)),
+        )
+
+    # ---- mapping ----
+
+    def open(self) -> None:
+        """Map the snapshot, creating (or replacing an incompatible) file if needed"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        with self._exclusive():
+            size = os.fstat(self._fd).st_size
+            header = os.pread(self._fd, HEADER.size, 0) if size >= HEADER_SIZE else b""
+            if not self._compatible(header):
+                if size:
+                    logger.warning(f"Snapshot {self.path} has an unknown layout, recreating it")
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, HEADER_SIZE + self.initial_capacity * RECORD.size)
+                os.pwrite(self._fd, HEADER.pack(MAGIC, VERSION, RECORD.size, self.initial_capacity, 0, 0, 0.0), 0)
+            self._remap()
+            self._sync_index()
+        logger.info(f"Mapped score snapshot {self.path} ({len(self._slots)} vaults, complete={self.complete})")
+
+    @staticmethod
+    def _compatible(header: bytes) -> bool:
+        if len(header) < HEADER.size:
+            return False
+        magic, version, record_size = HEADER.unpack(header)[:3]
+        return magic == MAGIC and version == VERSION and record_size == RECORD.size
+
+    def _remap(self) -> None:
+        size = os.fstat(self._fd).st_size
+        # Readers holding the old map keep it alive until they drop the reference
+        self._mm = mmap.mmap(self._fd, size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        self._capacity = (size - HEADER_SIZE) // RECORD.size
+
+    def _header(self) -> Tuple:
+        return HEADER.unpack_from(self._mm, 0)
+
+    def _sync_index(self) -> None:
+        """Index slots appended (by any process) since the last sync; caller holds _lock"""
+        used = self._header()[4]
+        if used <= self._indexed:
+            return
+        if used > self._capacity:
+            self._remap()
+        mm = self._mm
+        for slot in range(self._indexed, used):
+            vault_id = VAULT_ID.unpack_from(mm, HEADER_SIZE + slot * RECORD.size + VAULT_ID_OFFSET)[0]
+            self._slots[vault_id] = slot
+        self._indexed = used
+
+    def _slot(self, vault_id: int) -> Optional[int]:
+        slot = self._slots.get(vault_id)
+        if slot is None and self._header()[4] > self._indexed:
+            with self._lock:
+                self._sync_index()
+            slot = self._slots.get(vault_id)
+        return slot
+
+    @property
+    def is_open(self) -> bool:
+        return self._mm is not None
+
+    @property
+    def complete(self) -> bool:
+        return bool(self._mm is not None and self._header()[5] & FLAG_COMPLETE)
+
+    @property
+    def newest_timestamp(self) -> Optional[datetime]:
+        ts = self._header()[6] if self._mm is not None else 0.0
+        return datetime.fromtimestamp(ts) if ts else None
+
+    def close(self) -> None:
+        self._mm = None
+        self._slots = {}
+        self._indexed = 0
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    # ---- reads (lock-free) ----
+
+    def get(self, vault_id: int) -> Optional[ScoreRecord]:
+        """(score, risk_factors, timestamp) for a vault, or None if it is not in the snapshot"""
+        if self._mm is None:
+            return None
+        slot = self._slot(vault_id)
+        if slot is None:
+            self.misses += 1
+            return None
+        mm = self._mm
+        offset = HEADER_SIZE + slot * RECORD.size
+        for _ in range(100):
+            record = RECORD.unpack_from(mm, offset)
+            seq = record[0]
+            if seq & 1 or SEQ.unpack_from(mm, offset)[0] != seq:
+                continue  # writer mid-update; retry
+            break
+        else:
+            return None
+        if not record[1]:
+            self.misses += 1
+            return None
+        self.hits += 1
+        factors = {name: value for name, value in zip(FACTOR_NAMES, record[3:9]) if value != FACTOR_ABSENT}
+        return record[2], factors, datetime.fromtimestamp(record[10])
+
+    def vault_ids(self) -> List[int]:
+        """All vaults with a stored score, in ID order (O(vaults); call off the event loop)"""
+        if self._mm is None:
+            return []
+        with self._lock:
+            self._sync_index()
+            return sorted(self._slots)
+
+    # ---- writes (one writer at a time, host-wide) ----
+
+    @contextmanager
+    def _exclusive(self):
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    @contextmanager
+    def rebuild_guard(self):
+        """Yields True in exactly one process at a time; others should skip the rebuild"""
+        fd = os.open(self.path + ".rebuild", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    def _set_header(self, capacity: Optional[int] = None, used: Optional[int] = None,
+                    flags: Optional[int] = None, newest: Optional[float] = None) -> None:
+        magic, version, record_size, cur_capacity, cur_used, cur_flags, cur_newest = HEADER.unpack(
+            os.pread(self._fd, HEADER.size, 0)
+        )
+        os.pwrite(self._fd, HEADER.pack(
+            magic, version, record_size,
+            cur_capacity if capacity is None else capacity,
+            cur_used if used is None else used,
+            cur_flags if flags is None else flags,
+            cur_newest if newest is None else max(cur_newest, newest),
+        ), 0)
+
+    def _allocate(self, vault_id: int) -> Optional[int]:
+        """Slot for a new vault, growing the file by doubling; None once max_vaults is reached"""
+        _, _, _, capacity, used, _, _ = self._header()
+        if used >= self.max_vaults:
+            return None
+        if used >= capacity:
+            capacity = min(max(capacity * 2, used + 1), self.max_vaults)
+            os.ftruncate(self._fd, HEADER_SIZE + capacity * RECORD.size)
+            self._set_header(capacity=capacity)
+        if used >= self._capacity:
+            self._remap()
+        # The vault_id is written before the slot count, so readers never index a blank slot
+        VAULT_ID.pack_into(self._mm, HEADER_SIZE + used * RECORD.size + VAULT_ID_OFFSET, vault_id)
+        self._set_header(used=used + 1)
+        self._slots[vault_id] = used
+        self._indexed = used + 1
+        return used
+
+    def _write(self, vault_id: int, score: int, risk_factors: Dict, ts: float) -> bool:
+        if not 0 <= vault_id <= MAX_VAULT_ID:
+            return False
+        self._sync_index()
+        slot = self._slots.get(vault_id)
+        if slot is None:
+            slot = self._allocate(vault_id)
+            if slot is None:
+                return False
+        mm = self._mm
+        offset = HEADER_SIZE + slot * RECORD.size
+        # We hold the write lock, so the stored record is stable
+        if mm[offset + 4] and TIMESTAMP.unpack_from(mm, offset + TIMESTAMP_OFFSET)[0] > ts:
+            return False  # a newer score is already stored
+        seq = SEQ.unpack_from(mm, offset)[0]
+        if seq & 1:
+            seq += 1  # a writer died mid-update; the record is about to be replaced anyway
+        SEQ.pack_into(mm, offset, seq + 1)
+        factors = [_factor(risk_factors, name) for name in FACTOR_NAMES]
+        RECORD.pack_into(mm, offset, seq + 1, 1, max(0, min(100, int(score))), *factors, vault_id, ts)
+        SEQ.pack_into(mm, offset, seq + 2)
+        return True
+
+    def put(self, vault_id: int, score: int, risk_factors: Optional[Dict], timestamp: Optional[datetime] = None) -> bool:
+        """Store one score; False if it was not stored (snapshot closed, full, bad vault_id,
+        or a newer score for the vault is already there)"""
+        if self._mm is None:
+            return False
+        ts = (timestamp or datetime.now()).timestamp()
+        with self._exclusive():
+            stored = self._write(vault_id, score, risk_factors or {}, ts)
+            if stored:
+                self._set_header(newest=ts)
+        return stored
+
+    def load(self, rows: Iterable[ScoreRow]) -> int:
+        """Apply one chunk of (vault_id, score, risk_factors, timestamp) rows under one lock.
+        Callers fetch rows before calling, so the lock is never held across a DB read."""
+        if self._mm is None:
+            return 0
+        count = 0
+        newest = 0.0
+        with self._exclusive():
+            for vault_id, score, risk_factors, timestamp in rows:
+                ts = timestamp.timestamp() if timestamp else time.time()
+                if self._write(vault_id, score, risk_factors or {}, ts):
+                    newest = max(newest, ts)
+                    count += 1
+            self._set_header(newest=newest)
+        return count
+
+    def mark_complete(self) -> None:
+        if self._mm is None:
+            return
+        with self._exclusive():
+            self._set_header(flags=self._header()[5] | FLAG_COMPLETE)
+
+
+def _factor(risk_factors: Dict, name: str) -> int:
+    value = risk_factors.get(name)
+    if value is None:
+        return FACTOR_ABSENT
+    try:
+        return max(0, min(100, int(value)))
+    except (TypeError, ValueError):
+        return FACTOR_ABSENT
@@ -0,0 +1,62 @@
+"""
+Shared fixtures for the Helios agent tests
+Modules live flat in the agent directory and the network stand-ins in bench/, so both go on
+sys.path. Nothing here needs Postgres or the testnet: the models run on a throwaway SQLite
+file (JSONB columns are stored as JSON there).
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+
+# Before any agent module creates the engine; tests must never touch a configured database
+# (or the working directory's score snapshot)
+_scratch = tempfile.mkdtemp(prefix="helios-tests-")
+os.environ["NEXT_DATABASE_URL"] = "sqlite:///" + os.path.join(_scratch, "helios.db")
+os.environ["HELIOS_SNAPSHOT_PATH"] = os.path.join(_scratch, "scores.snap")
+os.environ.setdefault("APTOS_NODE_URL", "http://127.0.0.1:9/v1")
+os.environ.setdefault("HELIOS_EVENT_TRIGGERS", "false")
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+AGENT_DIR = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, AGENT_DIR)
+sys.path.insert(0, os.path.join(AGENT_DIR, "bench"))
+
+from stubs import FaultConfig, FullnodeStub  # noqa: E402
+
+
+@pytest.fixture
+def fullnode_stubs():
+    """Factory for started FullnodeStub servers, stopped at teardown"""
+    started = []
+
+    def start(faults: FaultConfig = None) -> FullnodeStub:
+        stub = FullnodeStub(faults).start()
+        started.append(stub)
+        return stub
+
+    yield start
+    for stub in started:
+        stub.stop()
+
+
+@pytest.fixture
+def database():
+    """Schema on the test SQLite file, emptied after each test"""
+    import db
+
+    db.init_db()
+    yield db
+    with db.engine.begin() as conn:
+        for table in reversed(db.Base.metadata.sorted_tables):
+            conn.execute(table.delete())
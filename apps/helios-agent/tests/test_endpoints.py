@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+import pytest
+import requests
+
+from stubs import FaultConfig, MODULE_ADDRESS, owner_for_vault
+from endpoints import FullnodePool, CIRCUIT_CLOSED, CIRCUIT_OPEN
+
+
+def test_slow_primary_is_hedged_to_runner_up(fullnode_stubs):
+    slow = fullnode_stubs(FaultConfig(latency_ms=400))
+    fast = fullnode_stubs()
+    pool = FullnodePool([slow.base_url, fast.base_url], default_hedge_delay=0.05)
+
+    async def run():
+        started = time.monotonic()
+        info = await pool.get("/")
+        return info, time.monotonic() - started
+
+    info, elapsed = asyncio.run(run())
+    assert info["chain_id"] == 2
+    assert elapsed < 0.3
+    assert pool.hedges_total == 1
+    assert fast.counters["requests"] == 1
+
+
+def test_failing_node_fails_over_and_is_ejected(fullnode_stubs):
+    bad = fullnode_stubs(FaultConfig(error_rate=1.0))
+    # Slow enough that the failing node still ranks first until it is ejected
+    good = fullnode_stubs(FaultConfig(latency_ms=400))
+    pool = FullnodePool([bad.base_url, good.base_url], failure_threshold=2, open_seconds=60)
+
+    async def run():
+        return [await pool.get("/") for _ in range(4)]
+
+    results = asyncio.run(run())
+    assert all(r["chain_id"] == 2 for r in results)
+    bad_ep, good_ep = pool.endpoints
+    assert bad_ep.state == CIRCUIT_OPEN
+    assert bad.counters["requests"] == 2  # not tried again once ejected
+    assert pool.ranked() == [good_ep]
+    assert pool.best_url() == good_ep.url
+
+
+def test_ejected_node_is_readmitted_after_a_successful_probe(fullnode_stubs):
+    flaky = fullnode_stubs(FaultConfig(error_rate=1.0))
+    other = fullnode_stubs()
+    pool = FullnodePool([flaky.base_url, other.base_url], failure_threshold=1, open_seconds=0.1)
+    flaky_ep = pool.endpoints[0]
+
+    async def run():
+        await pool.get("/")
+        assert flaky_ep.state == CIRCUIT_OPEN
+
+        # Still failing: the probe keeps it ejected and restarts the clock
+        await asyncio.sleep(0.15)
+        pool.ranked()
+        assert flaky_ep.probing
+        while flaky_ep.probing:
+            await asyncio.sleep(0.01)
+        assert flaky_ep.state == CIRCUIT_OPEN
+
+        flaky.faults.error_rate = 0.0
+        await asyncio.sleep(0.15)
+        assert flaky_ep not in pool.ranked()  # not admitted until the probe succeeds
+        while flaky_ep.probing:
+            await asyncio.sleep(0.01)
+        assert flaky_ep.state == CIRCUIT_CLOSED
+        assert flaky_ep in pool.ranked()
+
+    asyncio.run(run())
+
+
+def test_not_found_is_an_answer_not_a_node_failure(fullnode_stubs):
+    first = fullnode_stubs()
+    second = fullnode_stubs()
+    pool = FullnodePool([first.base_url, second.base_url], failure_threshold=1)
+    path = f"/accounts/{owner_for_vault(7)}/resource/{MODULE_ADDRESS}::vault::Events"
+
+    with pytest.raises(requests.HTTPError) as excinfo:
+        asyncio.run(pool.get(path))
+    assert excinfo.value.response.status_code == 404
+    assert all(ep.state == CIRCUIT_CLOSED and ep.consecutive_failures == 0 for ep in pool.endpoints)
+    assert second.counters["requests"] == 0
+
+
+def test_all_ejected_fails_open_on_least_recently_ejected():
+    pool = FullnodePool(["http://127.0.0.1:9/a", "http://127.0.0.1:9/b"], open_seconds=60)
+    a, b = pool.endpoints
+    for ep, opened in ((a, 20.0), (b, 10.0)):
+        ep.state = CIRCUIT_OPEN
+        ep.opened_at = time.monotonic() - opened
+    assert pool.ranked() == [a, b]
+
+
+def test_preferred_url_sticks_until_current_node_is_clearly_worse_or_ejected():
+    pool = FullnodePool(["http://127.0.0.1:9/a", "http://127.0.0.1:9/b"])
+    a, b = pool.endpoints
+    a._latencies.extend([0.12] * 10)
+    b._latencies.extend([0.10] * 10)
+    assert pool.best_url() == b.url
+    assert pool.preferred_url(a.url, switch_ratio=2.0) == a.url
+
+    a._latencies.extend([0.5] * 30)
+    assert pool.preferred_url(a.url, switch_ratio=2.0) == b.url
+
+    a._latencies.clear()
+    a._latencies.extend([0.1] * 10)
+    a.state = CIRCUIT_OPEN
+    a.opened_at = time.monotonic()
+    assert pool.preferred_url(a.url, switch_ratio=2.0) == b.url
@@ -0,0 +1,65 @@
+import asyncio
+import io
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet
+import pytest
+
+import export
+from modeling import RISK_FACTORS, RiskModelingEngine
+
+
+def test_columns_match_the_factors_the_model_produces():
+    assessment = asyncio.run(RiskModelingEngine().calculate_health_score({
+        "vault_id": 1,
+        "composition": {"mock": True, "assets": [], "total_value": 1},
+        "off_chain": {},
+    }))
+    assert tuple(assessment["risk_factors"]) == RISK_FACTORS
+    names = export.score_schema().names
+    assert names == ["vault_id", "score", *RISK_FACTORS, "timestamp"]
+    assert "payment_history" not in names
+
+
+@pytest.fixture
+def score_book(database):
+    rows = [
+        (3, 41, {"asset_diversity": 10, "ltv_ratio": 20, "originator_reputation": 30,
+                 "market_conditions": 40, "concentration_risk": 50}),
+        (1, 77, {"asset_diversity": 70, "ltv_ratio": "bad", "market_conditions": 75}),
+        (2, 60, None),
+    ]
+    session = database.get_session()
+    try:
+        for vault_id, score, factors in rows:
+            session.add(database.HealthScoreModel(
+                vault_id=vault_id, score=score, risk_factors=factors,
+                timestamp=datetime(2026, 5, 1, 12, vault_id),
+            ))
+        session.commit()
+    finally:
+        session.close()
+    return rows
+
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+def test_streamed_export_reads_back_with_pyarrow(score_book, fmt):
+    body = b"".join(export.stream_export(fmt, chunk_size=2))
+    if fmt == "parquet":
+        table = pa.parquet.read_table(io.BytesIO(body))
+    else:
+        table = pa.ipc.open_stream(body).read_all()
+
+    assert table.num_rows == 3
+    assert table.schema.metadata[b"helios.table"] == b"current"
+    columns = table.to_pydict()
+    assert columns["vault_id"] == [1, 2, 3]
+    assert columns["score"] == [77, 60, 41]
+    assert columns["asset_diversity"] == [70, None, 10]
+    assert columns["ltv_ratio"] == [None, None, 20]  # unparseable values export as null
+    assert columns["concentration_risk"] == [None, None, 50]
+    assert columns["timestamp"] == [datetime(2026, 5, 1, 12, v) for v in (1, 2, 3)]
+    # Every factor column carries data for at least one vault
+    assert all(any(v is not None for v in columns[name]) for name in RISK_FACTORS)
@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from exposure import ExposureIndex, NEUTRAL_SYSTEMIC
+
+
+def _assets(*originators, value=100.0):
+    return [{"originator": o, "asset_type": "invoice", "value": value} for o in originators]
+
+
+def test_systemic_term_is_neutral_until_fleet_coverage_is_reached():
+    index = ExposureIndex(min_fleet_coverage=0.8)
+    index.set_registered_vaults(5)
+    index.update_vault(1, "0x1", _assets("0xbig"))
+    index.update_vault(2, "0x2", _assets("0xbig"))
+    index.update_vault(3, "0x3", _assets("0xsmall"))
+    assert index.coverage == pytest.approx(0.6)
+    assert not index.systemic_ready
+    assert index._vault_metrics(index._vaults[1])[2] == NEUTRAL_SYSTEMIC
+    neutral_score = index.concentration_score(1)
+
+    index.update_vault(4, "0x4", _assets("0xbig"))
+    assert index.systemic_ready
+    # 0xbig holds three quarters of the fleet, so its vaults now score worse than neutral
+    assert index._vault_metrics(index._vaults[1])[2] == pytest.approx(0.75)
+    assert index.concentration_score(1) < neutral_score
+    assert index.fleet_metrics()["systemic_applied"]
+
+    index.set_registered_vaults(0)  # unknown fleet size never enables the term
+    assert not index.systemic_ready
+
+
+def test_restore_keeps_newer_holdings_and_does_not_notify():
+    index = ExposureIndex()
+    calls = []
+    index.listeners.append(lambda originators, affected: calls.append(affected))
+    index.update_vault(1, "0x1", _assets("0xa"))
+    index.update_vault(2, "0x2", _assets("0xa"))
+    live_as_of = index._vaults[1].as_of
+
+    assert not index.restore_vault(1, "0x1", _assets("0xb"), live_as_of - 60)
+    assert index.holdings(1) == [{"originator": "0xa", "asset_type": "invoice", "value": 100.0}]
+    assert index.restore_vault(2, "0x2", _assets("0xb"), live_as_of + 60)
+    assert index.vaults_exposed_to(["0xb"]) == [(2, "0x2")]
+    assert calls == []
+
+
+@pytest.fixture
+def worker(database, monkeypatch):
+    """main with a fresh (empty) exposure index, as in a newly started uvicorn worker"""
+    import main
+
+    index = ExposureIndex()
+    index.listeners.append(main._rescore_exposed_vaults)
+    queued = []
+    triggers = SimpleNamespace(
+        running=True,
+        queue=SimpleNamespace(enqueue=lambda vault_id, owner: queued.append((vault_id, owner)) or True),
+    )
+    monkeypatch.setattr(main.modeling_engine, "exposure_index", index)
+    monkeypatch.setattr(main, "event_triggers", triggers)
+    monkeypatch.setattr(main, "_exposure_synced_at", None)
+    return SimpleNamespace(main=main, index=index, queued=queued)
+
+
+def _store(main, vault_id, owner, holdings, when):
+    assessment = {"score": 70, "risk_factors": {"ltv_ratio": 70}}
+    main._store_assessment(vault_id, owner, assessment, when, holdings=holdings)
+
+
+def test_originator_rescore_finds_vaults_assessed_by_other_workers(worker):
+    main = worker.main
+    now = datetime.now()
+    # Persisted by other workers; this worker has assessed nothing
+    _store(main, 1, "0xaa", _assets("0xLender", "0xother"), now)
+    _store(main, 2, "0xbb", _assets("0xother"), now)
+    _store(main, 3, "0xcc", _assets("0xlender"), now)
+    assert len(worker.index) == 0
+
+    result = asyncio.run(main.rescore_originator("0xlender"))
+    assert result["vaults"] == [1, 3]
+    assert worker.queued == [(1, "0xaa"), (3, "0xcc")]
+
+    # Restored holdings count towards coverage of the registered fleet
+    worker.index.set_registered_vaults(main._count_registered_vaults())
+    assert worker.index.coverage == 1.0
+
+
+def test_exposure_sync_only_applies_newer_rows(worker):
+    main = worker.main
+    earlier = datetime.now() - timedelta(hours=1)
+    _store(main, 1, "0xaa", _assets("0xa"), earlier)
+    assert main._sync_exposure() == 1
+    worker.index.update_vault(1, "0xaa", _assets("0xlive"))  # assessed here since
+
+    later = datetime.now() + timedelta(minutes=1)
+    _store(main, 2, "0xbb", _assets("0xb"), later)
+    assert main._sync_exposure() == 1  # the vault 1 row is older than the live holdings
+    assert worker.index.vaults_exposed_to(["0xlive"]) == [(1, "0xaa")]
+    assert worker.index.vaults_exposed_to(["0xb"]) == [(2, "0xbb")]
@@ -0,0 +1,72 @@
+import pytest
+
+import metrics
+from metrics import Counter, Gauge, Histogram
+
+
+@pytest.fixture
+def registered():
+    """Metrics created in a test are dropped from the global registry afterwards"""
+    before = list(metrics._registry)
+    yield
+    metrics._registry[:] = before
+
+
+def _samples(metric):
+    """{sample name with labels: value} from the rendered exposition"""
+    lines = [line for line in metric.render().splitlines() if not line.startswith("#")]
+    return {name: value for name, value in (line.rsplit(" ", 1) for line in lines)}
+
+
+def test_histogram_buckets_are_cumulative_and_inclusive(registered):
+    hist = Histogram("test_latency_seconds", "Latency", ("stage",), buckets=(0.5, 0.1, 1.0))
+    # A value equal to a bound belongs in that bucket (le = less than or equal)
+    for value in (0.05, 0.1, 0.1000001, 0.5, 1.0, 7.0):
+        hist.observe(value, "model")
+
+    samples = _samples(hist)
+    assert samples['test_latency_seconds_bucket{stage="model",le="0.1"}'] == "2"
+    assert samples['test_latency_seconds_bucket{stage="model",le="0.5"}'] == "4"
+    assert samples['test_latency_seconds_bucket{stage="model",le="1.0"}'] == "5"
+    assert samples['test_latency_seconds_bucket{stage="model",le="+Inf"}'] == "6"
+    assert samples['test_latency_seconds_count{stage="model"}'] == "6"
+    assert float(samples['test_latency_seconds_sum{stage="model"}']) == pytest.approx(8.7500001)
+
+
+def test_histogram_series_are_kept_per_label_set(registered):
+    hist = Histogram("test_stage_seconds", "Stages", ("stage",), buckets=(1.0,))
+    hist.observe(0.5, "a")
+    hist.observe(2.0, "b")
+    hist.observe(3.0, "b")
+
+    samples = _samples(hist)
+    assert samples['test_stage_seconds_count{stage="a"}'] == "1"
+    assert samples['test_stage_seconds_sum{stage="a"}'] == "0.5"
+    assert samples['test_stage_seconds_bucket{stage="b",le="1.0"}'] == "0"
+    assert samples['test_stage_seconds_count{stage="b"}'] == "2"
+    assert samples['test_stage_seconds_sum{stage="b"}'] == "5.0"
+
+
+def test_text_format_escaping(registered):
+    counter = Counter("test_escaped_total", 'Help with a \\ backslash,\na newline and "quotes"', ("path",))
+    counter.inc('C:\\dir\n"x"')
+
+    lines = counter.render().splitlines()
+    assert lines[0] == '# HELP test_escaped_total Help with a \\\\ backslash,\\na newline and "quotes"'
+    assert lines[1] == "# TYPE test_escaped_total counter"
+    assert lines[2] == 'test_escaped_total{path="C:\\\\dir\\n\\"x\\""} 1.0'
+    assert len(lines) == 3  # nothing leaks onto extra lines
+
+
+def test_collectors_and_render(registered):
+    gauge = Gauge("test_queue_depth", "Depth", ("queue",), collector=lambda: {("rescore",): 3})
+    gauge.set(1, "publish")
+    broken = Gauge("test_broken", "Collector raises", collector=lambda: 1 / 0)
+
+    text = metrics.render()
+    assert text.endswith("\n")
+    assert 'test_queue_depth{queue="publish"} 1' in text.splitlines()
+    assert 'test_queue_depth{queue="rescore"} 3' in text.splitlines()
+    # A failing collector still renders its metadata and never breaks the scrape
+    assert "# TYPE test_broken gauge" in text
+    assert broken.samples() == []
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import os
+import threading
+
+import push
+from push import EVICTED, PgNotifyBridge, ScoreBroadcaster, notify_payload
+
+
+class _Cursor:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql):
+        pass
+
+
+class _Connection:
+    """Just enough of a psycopg2 connection for the LISTEN loop; poll() drops the link"""
+
+    def __init__(self):
+        self._read, self._write = os.pipe()
+        os.write(self._write, b"x")  # always readable, so the loop polls straight away
+        self.autocommit = False
+        self.notifies = []
+
+    def fileno(self):
+        return self._read
+
+    def cursor(self):
+        return _Cursor()
+
+    def poll(self):
+        raise ConnectionError("server closed the connection")
+
+    def close(self):
+        os.close(self._read)
+        os.close(self._write)
+
+
+def test_bridge_catches_up_after_reconnecting(monkeypatch):
+    monkeypatch.setattr(push.time, "sleep", lambda seconds: None)
+    catch_ups = []
+    done = threading.Event()
+    bridge = PgNotifyBridge(None, ScoreBroadcaster(), on_reconnect=catch_ups.append)
+    connects = []
+
+    def connect():
+        connects.append(push.time.time())
+        if len(connects) == 3:
+            bridge.stop()
+            done.set()
+        return _Connection()
+
+    monkeypatch.setattr(bridge, "_connect", connect)
+    thread = threading.Thread(target=bridge._run, daemon=True)
+    thread.start()
+    assert done.wait(5)
+    thread.join(5)
+    # No catch-up on the first connect; each reconnect gets the time the previous link dropped
+    assert len(catch_ups) == 2
+    assert connects[0] <= catch_ups[0] <= connects[1]
+    assert connects[1] <= catch_ups[1] <= connects[2]
+    assert not bridge.connected
+
+
+def test_slow_subscriber_is_evicted_without_blocking_others():
+    async def run():
+        broadcaster = ScoreBroadcaster(queue_size=2)
+        slow = broadcaster.subscribe()
+        fast = broadcaster.subscribe([7])
+        other_vault = broadcaster.subscribe([8])
+        delivered = []
+        for i in range(3):
+            delivered.append(broadcaster.publish_encoded(7, f"m{i}"))
+            await fast.queue.get()  # fast keeps up, slow never reads
+        return broadcaster, slow, fast, other_vault, delivered
+
+    broadcaster, slow, fast, other_vault, delivered = asyncio.run(run())
+    # Third publish overflows the slow queue: it is evicted and told so, fast still gets it
+    assert delivered == [2, 2, 1]
+    assert slow.evicted and not fast.evicted
+    # The oldest queued message makes room for the sentinel
+    assert [slow.queue.get_nowait() for _ in range(slow.queue.qsize())] == ["m1", EVICTED]
+    assert broadcaster.evicted_total == 1
+    assert broadcaster.delivered_total == 5
+    assert broadcaster.subscriber_count == 2
+    assert other_vault.queue.empty()
+
+
+def test_bridge_relays_remote_updates_and_skips_its_own():
+    async def run():
+        broadcaster = ScoreBroadcaster()
+        fleet = broadcaster.subscribe()
+        vault_7 = broadcaster.subscribe([7])
+        vault_8 = broadcaster.subscribe([8])
+        remote = []
+        bridge = PgNotifyBridge(None, broadcaster, on_remote=remote.append)
+        update = {"vault_id": 7, "score": 64, "risk_factors": {"ltv_ratio": 80}, "timestamp": "2026-01-01T00:00:00"}
+        message = json.dumps(update)
+        other_replica = json.dumps({"origin": "another-replica", "message": message})
+        # The listener thread relays; delivery happens on the serving loop
+        await asyncio.to_thread(bridge._relay, notify_payload(broadcaster, message))
+        await asyncio.to_thread(bridge._relay, "not json")
+        await asyncio.to_thread(bridge._relay, other_replica)
+        await asyncio.sleep(0.05)
+        return remote, update, message, fleet, vault_7, vault_8
+
+    remote, update, message, fleet, vault_7, vault_8 = asyncio.run(run())
+    assert remote == [update]
+    assert fleet.queue.get_nowait() == message and fleet.queue.empty()
+    assert vault_7.queue.get_nowait() == message and vault_7.queue.empty()
+    assert vault_8.queue.empty()
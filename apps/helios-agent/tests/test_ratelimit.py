@@ -0,0 +1,183 @@
+import asyncio
+import threading
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+from stubs import FaultConfig
+import pytest
+
+from ratelimit import (
+    UpstreamLimiter, UpstreamThrottled, parse_retry_after, request_priority,
+    OUTCOME_OK, OUTCOME_THROTTLED, OUTCOME_ERROR, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND,
+)
+
+
+def test_parse_retry_after_seconds_and_http_date():
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after("-3") == 0.0
+    when = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 <= parse_retry_after(when) <= 30
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+
+def test_aimd_additive_increase_and_multiplicative_decrease():
+    async def run():
+        limiter = UpstreamLimiter("test", rate=1000, initial_concurrency=4, max_concurrency=8, decrease_cooldown=0)
+        for _ in range(4):
+            await limiter.acquire()
+            limiter.release(OUTCOME_OK)
+        assert limiter.concurrency_limit == 4  # +1/limit per success: 4 successes ~ +1 window
+        assert limiter._limit > 4.9
+
+        await limiter.acquire()
+        limiter.release(OUTCOME_THROTTLED)
+        assert limiter.concurrency_limit == 2
+        assert limiter.throttled_total == 1
+
+        for _ in range(5):
+            await limiter.acquire()
+            limiter.release(OUTCOME_ERROR)
+        assert limiter.concurrency_limit == limiter.min_concurrency
+        assert limiter.errors_total == 5
+
+        for _ in range(200):
+            await limiter.acquire()
+            limiter.release(OUTCOME_OK)
+        assert limiter.concurrency_limit == 8
+
+    asyncio.run(run())
+
+
+def test_decrease_cooldown_collapses_a_burst_of_failures():
+    async def run():
+        limiter = UpstreamLimiter("test", rate=1000, initial_concurrency=16, decrease_cooldown=60)
+        for _ in range(4):
+            await limiter.acquire()
+        for _ in range(4):
+            limiter.release(OUTCOME_ERROR)
+        assert limiter.concurrency_limit == 8
+
+    asyncio.run(run())
+
+
+def test_interactive_waiters_are_dispatched_before_background():
+    async def run():
+        limiter = UpstreamLimiter("test", rate=1000, initial_concurrency=1, max_concurrency=1)
+        await limiter.acquire()  # hold the only slot
+        order = []
+
+        async def waiter(name, priority):
+            await limiter.acquire(priority)
+            order.append(name)
+            limiter.release(OUTCOME_OK)
+
+        tasks = [asyncio.ensure_future(waiter(f"bg{i}", PRIORITY_BACKGROUND)) for i in range(3)]
+        await asyncio.sleep(0)
+        with request_priority(PRIORITY_INTERACTIVE):
+            tasks.append(asyncio.ensure_future(waiter("interactive", None)))
+        await asyncio.sleep(0)
+        assert limiter.queue_depth == 4
+
+        limiter.release(OUTCOME_OK)
+        await asyncio.gather(*tasks)
+        assert order == ["interactive", "bg0", "bg1", "bg2"]
+
+    asyncio.run(run())
+
+
+def test_retry_after_pauses_dispatch():
+    async def run():
+        limiter = UpstreamLimiter("test", rate=1000, initial_concurrency=4)
+        await limiter.acquire()
+        limiter.release(OUTCOME_THROTTLED, retry_after=0.3)
+        started = time.monotonic()
+        await limiter.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) >= 0.28
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def run():
+        limiter = UpstreamLimiter("test", rate=1000, initial_concurrency=1, max_concurrency=1)
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        limiter.release(OUTCOME_OK)
+        await asyncio.wait_for(limiter.acquire(), timeout=1)
+        assert limiter.in_flight == 1
+
+    asyncio.run(run())
+
+
+def test_request_raises_once_throttled_retries_run_out(fullnode_stubs):
+    stub = fullnode_stubs(FaultConfig(throttle_rate=1.0, retry_after=0.1))
+    limiter = UpstreamLimiter("test", rate=1000, initial_concurrency=4, decrease_cooldown=0)
+
+    async def run():
+        started = time.monotonic()
+        with pytest.raises(UpstreamThrottled) as excinfo:
+            await limiter.request("GET", stub.base_url + "/", max_retries=2, timeout=5)
+        return excinfo.value, time.monotonic() - started
+
+    error, elapsed = asyncio.run(run())
+    assert error.response.status_code == 429
+    assert stub.counters["requests"] == 3
+    assert limiter.throttled_total == 3
+    assert limiter.exhausted_total == 1
+    assert limiter.concurrency_limit == 1
+    assert elapsed >= 0.2  # two Retry-After pauses
+
+
+def test_exhausted_server_errors_return_the_last_response(fullnode_stubs):
+    stub = fullnode_stubs(FaultConfig(error_rate=1.0))
+
+    async def run():
+        limiter = UpstreamLimiter("test", rate=1000)
+        return await limiter.request("GET", stub.base_url + "/", max_retries=0, timeout=5), limiter
+
+    resp, limiter = asyncio.run(run())
+    assert resp.status_code == 503
+    assert limiter.exhausted_total == 0
+
+
+def test_each_worker_thread_gets_its_own_session(fullnode_stubs):
+    stub = fullnode_stubs()
+    limiter = UpstreamLimiter("test", rate=1000, initial_concurrency=16, max_concurrency=16)
+    sessions = []
+    send = limiter._send
+
+    def recording_send(method, url, **kwargs):
+        resp = send(method, url, **kwargs)
+        sessions.append((threading.get_ident(), limiter._local.session))
+        return resp
+
+    limiter._send = recording_send
+
+    async def run():
+        await asyncio.gather(*(limiter.request("GET", stub.base_url + "/", timeout=5) for _ in range(32)))
+
+    asyncio.run(run())
+    by_thread = {}
+    for ident, session in sessions:
+        assert by_thread.setdefault(ident, session) is session  # reused within a thread
+    assert len({id(s) for s in by_thread.values()}) == len(by_thread)  # never shared across threads
+
+
+def test_request_recovers_once_upstream_stops_throttling(fullnode_stubs):
+    stub = fullnode_stubs(FaultConfig(throttle_rate=1.0, retry_after=0.1))
+
+    async def run():
+        limiter = UpstreamLimiter("test", rate=1000)
+        pending = asyncio.ensure_future(limiter.request("GET", stub.base_url + "/", max_retries=5, timeout=5))
+        await asyncio.sleep(0.15)
+        stub.faults.throttle_rate = 0.0
+        return await pending
+
+    resp = asyncio.run(run())
+    assert resp.status_code == 200
+    assert resp.json()["chain_id"] == 2
@@ -0,0 +1,149 @@
+import asyncio
+import gc
+from datetime import datetime, timedelta
+
+import pytest
+import requests
+
+from reconcile import (
+    ScoreReconciler, OUTCOME_MATCH, OUTCOME_DRIFT, OUTCOME_UNINITIALIZED,
+    OUTCOME_MISMATCHED_VAULT, OUTCOME_ERROR, OUTCOME_PENDING,
+)
+
+FACTORS = {"asset_diversity": 60, "ltv_ratio": 70, "originator_reputation": 80, "market_conditions": 90}
+SETTLED = datetime.now() - timedelta(hours=1)
+
+
+def _http_error(status: int) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status}", response=response)
+
+
+class _Pool:
+    """Fullnode pool answering HealthScore reads from a dict keyed by owner"""
+
+    def __init__(self, state):
+        self.state = state
+        self.reads = []
+
+    async def get(self, path):
+        owner = path.split("/")[2]
+        self.reads.append(owner)
+        answer = self.state.get(owner)
+        if isinstance(answer, Exception):
+            raise answer
+        if answer is None:
+            raise _http_error(404)
+        return {"data": answer}
+
+
+def _onchain(vault_id, score, factors=FACTORS):
+    return {"vault_id": str(vault_id), "current": str(score), "risk_factors": {k: str(v) for k, v in factors.items()}}
+
+
+@pytest.fixture
+def reconciler():
+    async def publish(vault_id, owner, score, risk_factors):
+        return {"success": True}
+
+    return ScoreReconciler(publish, module_address="0xmod", grace_seconds=120)
+
+
+def test_page_merge_classifies_every_vault(reconciler):
+    reconciler.fullnode_pool = _Pool({
+        "0x05": _onchain(5, 70),                     # matches
+        "0x03": _onchain(3, 10),                     # score drifted
+        "0x09": _onchain(9, 55, {**FACTORS, "ltv_ratio": 1}),  # a factor drifted
+        "0x07": _onchain(99, 40),                    # owner's oracle tracks another vault
+        "0x11": _http_error(503),                    # read failed
+        # 0x01 has no HealthScore resource (404)
+    })
+    rows = [
+        (1, "0x01", 50, FACTORS, SETTLED),
+        (3, "0x03", 60, FACTORS, SETTLED),
+        (5, "0x05", 70, FACTORS, SETTLED),
+        (7, "0x07", 40, FACTORS, SETTLED),
+        (9, "0x09", 55, FACTORS, SETTLED),
+        (11, "0x11", 30, FACTORS, SETTLED),
+    ]
+
+    outcomes = asyncio.run(reconciler.reconcile_page(rows))
+    assert outcomes == {
+        OUTCOME_MATCH: 1, OUTCOME_DRIFT: 2, OUTCOME_UNINITIALIZED: 1,
+        OUTCOME_MISMATCHED_VAULT: 1, OUTCOME_ERROR: 1, OUTCOME_PENDING: 0,
+    }
+    queued = [reconciler.publish_queue.get_nowait() for _ in range(reconciler.publish_queue.qsize())]
+    assert queued == [(3, "0x03", 60, FACTORS), (9, "0x09", 55, FACTORS)]
+    assert reconciler._queued == {3, 9}
+
+
+def test_recent_scores_are_skipped_during_the_grace_period(reconciler):
+    reconciler.fullnode_pool = pool = _Pool({"0x01": _onchain(1, 10), "0x02": _onchain(2, 10)})
+    rows = [
+        (1, "0x01", 60, FACTORS, datetime.now() - timedelta(seconds=30)),
+        (2, "0x02", 60, FACTORS, SETTLED),
+    ]
+    outcomes = asyncio.run(reconciler.reconcile_page(rows))
+    assert outcomes[OUTCOME_PENDING] == 1
+    assert outcomes[OUTCOME_DRIFT] == 1
+    assert pool.reads == ["0x02"]  # the recent row is not even read
+
+
+def test_queued_vaults_are_not_queued_again(reconciler):
+    reconciler.fullnode_pool = _Pool({"0x01": _onchain(1, 10)})
+    rows = [(1, "0x01", 60, FACTORS, SETTLED)]
+    first = asyncio.run(reconciler.reconcile_page(rows))
+    second = asyncio.run(reconciler.reconcile_page(rows))
+    assert first[OUTCOME_DRIFT] == 1
+    assert second[OUTCOME_PENDING] == 1 and second[OUTCOME_DRIFT] == 0
+    assert reconciler.publish_queue.qsize() == 1
+
+
+def test_pass_walks_keyset_pages_in_vault_order(reconciler, database):
+    session = database.get_session()
+    try:
+        for vault_id in (8, 2, 5, 3, 13):
+            owner = f"0x{vault_id:02d}"
+            session.add(database.HealthScoreModel(vault_id=vault_id, score=60, risk_factors=FACTORS, timestamp=SETTLED))
+            session.add(database.VaultRegistryModel(vault_id=vault_id, owner_address=owner))
+        session.commit()
+    finally:
+        session.close()
+    assert [r[0] for r in reconciler._load_page(-1, 2)] == [2, 3]
+    assert [r[0] for r in reconciler._load_page(3, 2)] == [5, 8]
+    assert [r[0] for r in reconciler._load_page(8, 2)] == [13]
+
+    reconciler.page_size = 2
+    reconciler.fullnode_pool = _Pool({f"0x{v:02d}": _onchain(v, 60) for v in (2, 3, 5, 8, 13)})
+    stats = asyncio.run(reconciler.run_pass())
+    assert (stats["pages"], stats["vaults"], stats[OUTCOME_MATCH]) == (3, 5, 5)
+    assert reconciler.cursor == -1
+
+
+def test_failed_triggered_pass_is_logged_and_reported(reconciler, monkeypatch, caplog):
+    def broken_page(after_vault_id, limit):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(reconciler, "_load_page", broken_page)
+    unretrieved = []
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        loop.set_exception_handler(lambda loop, context: unretrieved.append(context))
+        assert reconciler.trigger()
+        # Nobody awaits the pass; only the done-callback looks at its outcome
+        while reconciler.running:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0)
+        status = reconciler.status()
+        reconciler._pass_task = None
+        gc.collect()  # an unretrieved exception is reported when the task is collected
+        await reconciler.stop()
+        return status
+
+    status = asyncio.run(run())
+    assert not status["running"]
+    assert status["last_error"]["error"] == "RuntimeError: database went away"
+    assert "Reconciliation pass failed" in caplog.text
+    assert unretrieved == []
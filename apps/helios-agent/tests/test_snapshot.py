@@ -0,0 +1,162 @@
+import multiprocessing
+import os
+import time
+from datetime import datetime
+
+import pytest
+
+from snapshot import ScoreSnapshot, FACTOR_NAMES, HEADER_SIZE, RECORD
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    return str(tmp_path / "scores.snap")
+
+
+def _open(path, **kwargs):
+    snap = ScoreSnapshot(path, **kwargs)
+    snap.open()
+    return snap
+
+
+def _factors(value):
+    return {name: value for name in FACTOR_NAMES}
+
+
+def test_put_get_round_trip(snapshot_path):
+    snap = _open(snapshot_path)
+    ts = datetime(2026, 1, 2, 3, 4, 5)
+    assert snap.put(7, 64, {"ltv_ratio": 80, "asset_diversity": 250, "market_conditions": "bad"}, ts)
+    score, factors, stored_ts = snap.get(7)
+    assert score == 64
+    assert factors == {"ltv_ratio": 80, "asset_diversity": 100}  # clamped; unparseable dropped
+    assert stored_ts == ts
+    assert snap.get(8) is None
+    assert (snap.hits, snap.misses) == (1, 1)
+    snap.close()
+
+
+def test_slots_are_dense_regardless_of_vault_id(snapshot_path):
+    snap = _open(snapshot_path, initial_capacity=4)
+    vault_ids = [3, 2 ** 32, 200_000_000, 2 ** 63 - 1, 1, 99]
+    for vault_id in vault_ids:
+        assert snap.put(vault_id, 50, {})
+    assert snap.vault_ids() == sorted(vault_ids)
+    # Doubled once from 4 slots; size tracks the number of vaults, not the largest ID
+    assert os.path.getsize(snapshot_path) == HEADER_SIZE + 8 * RECORD.size
+    assert not snap.put(2 ** 64, 50, {})
+    assert not snap.put(-1, 50, {})
+    snap.close()
+
+
+def test_capacity_cap_rejects_new_vaults_but_updates_existing(snapshot_path):
+    snap = _open(snapshot_path, initial_capacity=2, max_vaults=3)
+    assert all(snap.put(v, 10, {}) for v in (1, 2, 3))
+    assert not snap.put(4, 10, {})
+    assert snap.put(2, 90, {})
+    assert snap.get(2)[0] == 90
+    assert snap.get(4) is None
+    snap.close()
+
+
+def test_reopen_rebuilds_index_and_keeps_complete_flag(snapshot_path):
+    snap = _open(snapshot_path)
+    rows = [(v, v % 100, _factors(v % 100), datetime(2026, 1, 1)) for v in range(1, 2001)]
+    assert snap.load(rows[:1000]) == 1000
+    assert snap.load(rows[1000:]) == 1000
+    assert not snap.complete
+    snap.mark_complete()
+    snap.close()
+
+    reopened = _open(snapshot_path)
+    assert reopened.complete
+    assert reopened.newest_timestamp == datetime(2026, 1, 1)
+    assert len(reopened.vault_ids()) == 2000
+    assert reopened.get(1234)[0] == 34
+    reopened.close()
+
+
+def test_incompatible_file_is_recreated(snapshot_path):
+    with open(snapshot_path, "wb") as f:
+        f.write(b"not a snapshot" * 100)
+    snap = _open(snapshot_path)
+    assert snap.vault_ids() == []
+    assert snap.put(1, 50, {})
+    snap.close()
+
+
+def test_growth_in_another_process_is_visible(snapshot_path):
+    reader = _open(snapshot_path, initial_capacity=2)
+    writer = _open(snapshot_path, initial_capacity=2)
+    for vault_id in range(100):
+        writer.put(vault_id, vault_id, {})
+    assert reader.get(99)[0] == 99  # remaps past its original 2-slot mapping
+    assert reader.vault_ids() == list(range(100))
+    writer.close()
+    reader.close()
+
+
+def test_rebuild_guard_admits_one_owner(snapshot_path):
+    first = _open(snapshot_path)
+    second = _open(snapshot_path)
+    with first.rebuild_guard() as owner:
+        assert owner
+        with second.rebuild_guard() as other:
+            assert not other
+    with second.rebuild_guard() as owner:
+        assert owner
+    first.close()
+    second.close()
+
+
+def _writer(path, vault_ids, deadline):
+    snap = _open(path)
+    value = 0
+    while time.monotonic() < deadline:
+        value = (value + 1) % 100
+        for vault_id in vault_ids:
+            snap.put(vault_id, value, _factors(value))
+
+
+def _reader(path, vault_ids, deadline, torn):
+    snap = _open(path)
+    while time.monotonic() < deadline:
+        for vault_id in vault_ids:
+            record = snap.get(vault_id)
+            if record is not None and set(record[1].values()) != {record[0]}:
+                torn.value += 1
+
+
+def test_seqlock_readers_never_see_torn_records(snapshot_path):
+    vault_ids = list(range(1, 33))
+    setup = _open(snapshot_path)
+    for vault_id in vault_ids:
+        setup.put(vault_id, 0, _factors(0))
+    setup.close()
+
+    ctx = multiprocessing.get_context("fork")
+    torn = ctx.Value("i", 0)
+    deadline = time.monotonic() + 1.0
+    procs = [ctx.Process(target=_writer, args=(snapshot_path, vault_ids, deadline)) for _ in range(2)]
+    procs += [ctx.Process(target=_reader, args=(snapshot_path, vault_ids, deadline, torn)) for _ in range(2)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join(timeout=10)
+        assert proc.exitcode == 0
+    assert torn.value == 0
+
+
+def test_older_scores_never_replace_newer_ones(snapshot_path):
+    snap = _open(snapshot_path)
+    newer = datetime(2026, 3, 1, 12, 0, 0)
+    older = datetime(2026, 3, 1, 11, 0, 0)
+    assert snap.put(5, 80, {}, newer)
+    # A catch-up chunk read before the live put must not roll the vault back
+    assert snap.load([(5, 20, {}, older), (6, 30, {}, older)]) == 1
+    assert not snap.put(5, 10, {}, older)
+    assert snap.get(5)[0] == 80
+    assert snap.get(5)[2] == newer
+    assert snap.put(5, 70, {}, newer)  # same timestamp still applies
+    assert snap.get(5)[0] == 70
+    snap.close()
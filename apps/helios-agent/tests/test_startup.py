@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def agent(database, monkeypatch):
+    """main with schema creation held until the test releases it"""
+    import main
+
+    for key, value in (("schema", False), ("publisher", False), ("fullnode", False), ("warmup_seconds", None)):
+        monkeypatch.setitem(main.readiness, key, value)
+    schema_gate = threading.Event()
+
+    def init_db():
+        assert schema_gate.wait(10), "schema gate never released"
+        database.init_db()
+
+    assessed = []
+
+    async def run_assessment(vault_id, vault_owner, priority=None):
+        assessed.append(vault_id)
+        return {"score": 70, "risk_factors": {"ltv_ratio": 70}}
+
+    async def publish_in_background(*args):
+        pass
+
+    monkeypatch.setattr(main, "init_db", init_db)
+    monkeypatch.setattr(main, "run_assessment", run_assessment)
+    monkeypatch.setattr(main, "publish_in_background", publish_in_background)
+    with TestClient(main.app) as client:
+        yield client, schema_gate, assessed
+        schema_gate.set()  # never leave the warm-up thread blocked
+
+
+def _wait_ready(client, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = client.get("/ready")
+        if response.status_code == 200:
+            return response
+        time.sleep(0.05)
+    raise AssertionError(f"/ready never turned 200: {response.json()}")
+
+
+def test_live_answers_while_ready_and_assess_wait_for_the_schema(agent):
+    client, schema_gate, assessed = agent
+    assess = {"vault_id": 7, "vault_owner": "0xaa"}
+
+    assert client.get("/live").json() == {"status": "alive"}
+    ready = client.get("/ready")
+    assert ready.status_code == 503
+    assert ready.json()["status"] == "starting" and ready.json()["schema"] is False
+
+    refused = client.post("/api/v1/vaults/7/assess", json=assess)
+    assert refused.status_code == 503
+    assert refused.headers["retry-after"] == "5"
+    assert assessed == []
+
+    schema_gate.set()
+    ready = _wait_ready(client)
+    assert ready.json()["schema"] is True and ready.json()["publisher"] is True
+    assert client.get("/live").status_code == 200
+
+    accepted = client.post("/api/v1/vaults/7/assess", json=assess)
+    assert accepted.status_code == 200
+    assert accepted.json()["score"] == 70
+    assert assessed == [7]
@@ -0,0 +1,71 @@
+import asyncio
+import json
+import time
+
+from tracing import Tracer
+
+
+def _exported_spans(path, traces, timeout=5.0):
+    """Spans from the export file once `traces` traces have been written"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if path.exists():
+            lines = path.read_text().splitlines()
+            if len(lines) >= traces:
+                return [
+                    span
+                    for line in lines
+                    for resource in json.loads(line)["resourceSpans"]
+                    for scope in resource["scopeSpans"]
+                    for span in scope["spans"]
+                ]
+        time.sleep(0.02)
+    raise AssertionError(f"{traces} trace(s) not exported to {path}")
+
+
+def test_background_publish_trace_links_to_the_request_span(tmp_path, monkeypatch):
+    import main
+
+    path = tmp_path / "traces.jsonl"
+    test_tracer = Tracer(export_target=f"file:{path}")
+    published = []
+
+    async def publish(owner, score, risk_factors):
+        published.append(test_tracer.current_span())
+        return {"success": True}
+
+    monkeypatch.setattr(main, "tracer", test_tracer)
+    monkeypatch.setattr(main.oracle_publisher, "publish_health_score", publish)
+    monkeypatch.setattr(main, "pending_publishes", 1)
+
+    with test_tracer.root_span("POST /api/v1/vaults/7/assess", force=True) as request_span:
+        pass
+    asyncio.run(main.publish_in_background("0xaa", 70, {}, request_span))
+
+    assert main.pending_publishes == 0
+    spans = {s["name"]: s for s in _exported_spans(path, 2)}
+    request, publish_span = spans["POST /api/v1/vaults/7/assess"], spans["publish_health_score"]
+    # A separate trace (the request finished long ago) that follows from the request span
+    assert publish_span["traceId"] != request["traceId"]
+    assert "parentSpanId" not in publish_span
+    assert publish_span["links"] == [{"traceId": request["traceId"], "spanId": request["spanId"]}]
+    assert published[0].trace_id == publish_span["traceId"]
+    assert all(attr["key"] != "parent_trace_id" for attr in publish_span["attributes"])
+
+
+def test_untraced_request_publishes_without_a_trace(tmp_path, monkeypatch):
+    import main
+
+    path = tmp_path / "traces.jsonl"
+    test_tracer = Tracer(export_target=f"file:{path}")
+
+    async def publish(owner, score, risk_factors):
+        assert test_tracer.current_span() is None
+        return {"success": True}
+
+    monkeypatch.setattr(main, "tracer", test_tracer)
+    monkeypatch.setattr(main.oracle_publisher, "publish_health_score", publish)
+    monkeypatch.setattr(main, "pending_publishes", 1)
+    asyncio.run(main.publish_in_background("0xaa", 70, {}, None))
+    assert main.pending_publishes == 0
+    assert not path.exists()
@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+
+from stubs import MODULE_ADDRESS
+from endpoints import FullnodePool
+from triggers import EventTriggerPipeline
+
+OWNER_A = "0x" + "0a" * 32
+OWNER_B = "0x" + "0b" * 32
+WATCHED = "0x" + "0c" * 32
+
+
+def _event(struct, data, account=OWNER_A):
+    return {
+        "type": f"{MODULE_ADDRESS}::{struct}",
+        "guid": {"creation_number": "3", "account_address": account},
+        "sequence_number": "0",
+        "data": data,
+    }
+
+
+def _txn(version, *events):
+    return {"version": str(version), "type": "user_transaction", "events": list(events)}
+
+
+@pytest.fixture
+def pipeline(database, fullnode_stubs, monkeypatch):
+    monkeypatch.setenv("HELIOS_WATCH_ADDRESSES", WATCHED)
+    stub = fullnode_stubs()
+    pipe = EventTriggerPipeline(_no_rescore, module_address=MODULE_ADDRESS, debounce_seconds=0, page_size=2)
+    pipe.fullnode_pool = FullnodePool([stub.base_url])
+    session = database.get_session()
+    session.add_all([
+        database.VaultRegistryModel(vault_id=5, owner_address=OWNER_A),
+        database.VaultRegistryModel(vault_id=6, owner_address=OWNER_B),
+    ])
+    session.commit()
+    session.close()
+    return pipe, stub
+
+
+async def _no_rescore(vault_id, owner):
+    return None
+
+
+def test_fresh_cursor_starts_at_head_and_advances(pipeline):
+    pipe, stub = pipeline
+    stub.transactions = [_txn(900, _event("vault::RWAAddedEvent", {"vault_id": "5"}))]
+
+    assert asyncio.run(pipe.poll_once()) == 0  # history before the head is not replayed
+    assert pipe.next_version == 1001
+
+    stub.transactions += [_txn(v) for v in range(1001, 1006)]
+    stub.transactions.append(_txn(1006, _event("waterfall::PaymentProcessedEvent", {"vault_id": "6"})))
+    assert asyncio.run(pipe.poll_once()) == 1  # three pages of two
+    assert pipe.next_version == 1007
+
+    restarted = EventTriggerPipeline(_no_rescore, module_address=MODULE_ADDRESS)
+    restarted.fullnode_pool = pipe.fullnode_pool
+    asyncio.run(restarted.poll_once())
+    assert restarted.next_version == 1007
+
+
+def test_page_budget_bounds_a_cycle(pipeline):
+    pipe, stub = pipeline
+    pipe.max_pages = 2
+    asyncio.run(pipe.poll_once())
+    stub.transactions = [_txn(v) for v in range(1001, 1011)]
+    asyncio.run(pipe.poll_once())
+    assert pipe.next_version == 1005
+    asyncio.run(pipe.poll_once())
+    assert pipe.next_version == 1009
+
+
+def test_events_map_to_vaults_by_id_or_vault_id(pipeline):
+    pipe, stub = pipeline
+    asyncio.run(pipe.poll_once())
+    stub.transactions = [
+        _txn(1001, _event("vault::VaultCreatedEvent", {"id": "5", "owner": OWNER_A})),
+        _txn(1002, _event("tranche::InvestEvent", {"vault_id": "6", "tranche": 0, "amount": "10"}, account=OWNER_B)),
+        # Not registered, not at a watched account: ignored
+        _txn(1003, _event("waterfall::PaymentProcessedEvent", {"vault_id": "7"}, account=OWNER_A)),
+        # Not registered yet, but emitted at a watched account
+        _txn(1004, _event("vault::VaultCreatedEvent", {"id": "8", "owner": WATCHED}, account=WATCHED)),
+        # Our own publications and other modules' events never trigger rescoring
+        _txn(1005, _event("risk_oracle::ScoreUpdateEvent", {"vault_id": "5"})),
+        _txn(1006, {"type": "0x1::coin::DepositEvent", "data": {"amount": "1"}}),
+    ]
+    assert asyncio.run(pipe.poll_once()) == 3
+    assert dict(pipe.queue._pending.items()).keys() == {5, 6, 8}
+    assert pipe.queue._pending[5][0] == OWNER_A
+    assert pipe.queue._pending[6][0] == OWNER_B
+    assert pipe.queue._pending[8][0] == WATCHED
+    assert pipe.events_seen_total == 4
+    assert pipe.events_ignored_total == 1
+
+
+def test_repeated_events_for_a_vault_are_deduplicated(pipeline):
+    pipe, stub = pipeline
+    pipe.queue.debounce_seconds = 60
+    asyncio.run(pipe.poll_once())
+    stub.transactions = [
+        _txn(1001, _event("vault::RWAAddedEvent", {"vault_id": "5"}), _event("tranche::MintEvent", {"vault_id": "5"})),
+        _txn(1002, _event("waterfall::PaymentProcessedEvent", {"vault_id": "5"})),
+    ]
+    assert asyncio.run(pipe.poll_once()) == 1
+    stub.transactions.append(_txn(1003, _event("waterfall::PaymentProcessedEvent", {"vault_id": "5"})))
+    assert asyncio.run(pipe.poll_once()) == 0
+    assert len(pipe.queue) == 1
+    assert pipe.queue.enqueued_total == 1
+    assert pipe.queue.deduplicated_total == 1
+
+
+def test_stop_cancels_in_flight_rescores(pipeline):
+    pipe, stub = pipeline
+    started = []
+
+    async def slow_rescore(vault_id, owner):
+        started.append(vault_id)
+        await asyncio.sleep(60)
+
+    pipe.rescore = slow_rescore
+
+    async def run():
+        pipe.start()
+        pipe.queue.enqueue(5, OWNER_A)
+        while not started:
+            await asyncio.sleep(0.01)
+        running = list(pipe._running)
+        await pipe.stop()
+        return running
+
+    running = asyncio.run(run())
+    assert running and all(task.cancelled() for task in running)
+    assert not pipe.running and not pipe._running
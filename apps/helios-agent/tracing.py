@@ -0,0 +1,224 @@
+"""
+Opt-in request tracing for Helios Risk Oracle
+Root spans are sampled per request (HELIOS_TRACE_SAMPLE_RATE, or forced with the
+X-Helios-Trace header); child spans for ingestion, modeling, SQL and publishing are only
+recorded inside a sampled trace, so unsampled requests pay one contextvar lookup per span.
+Finished traces are exported as OTLP/JSON, either appended to a local file or POSTed to
+an OTLP/HTTP collector. Work that outlives its request (e.g. background publishing) gets
+its own trace with an OTLP link back to the request span.
+"""
+
+import os
+import json
+import time
+import queue
+import random
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "helios-agent"
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error", "trace", "links")
+
+    def __init__(self, name: str, trace: "Trace", parent_id: Optional[str], attributes: Dict[str, Any],
+                 links: Optional[List["Span"]] = None):
+        self.name = name
+        self.trace = trace
+        self.trace_id = trace.trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = dict(attributes)
+        self.error: Optional[str] = None
+        # (trace_id, span_id) of causally related spans in other traces
+        self.links = [(s.trace_id, s.span_id) for s in links or ()]
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.links:
+            span["links"] = [{"traceId": t, "spanId": s} for t, s in self.links]
+        return span
+
+
+class Trace:
+    """Spans of one sampled request; exported together when the root span ends"""
+
+    def __init__(self):
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List[Span] = []
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def _otlp_request(spans: List[Span]) -> Dict[str, Any]:
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+            "scopeSpans": [{
+                "scope": {"name": "helios.tracing"},
+                "spans": [s.to_otlp() for s in spans],
+            }],
+        }]
+    }
+
+
+class _Exporter:
+    """Ships finished traces from a daemon thread so request handling never blocks on I/O"""
+
+    def __init__(self, target: str):
+        self.target = target
+        self._queue: "queue.Queue[List[Span]]" = queue.Queue(maxsize=1000)
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="helios-trace-exporter", daemon=True)
+        self._thread.start()
+
+    def submit(self, spans: List[Span]) -> None:
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            spans = self._queue.get()
+            try:
+                self._export(_otlp_request(spans))
+            except Exception as e:
+                logger.warning(f"Trace export to {self.target} failed: {e}")
+
+    def _export(self, payload: Dict[str, Any]) -> None:
+        if self.target.startswith("otlp:"):
+            import requests
+            requests.post(self.target[len("otlp:"):], json=payload, timeout=5)
+        else:
+            path = self.target[len("file:"):] if self.target.startswith("file:") else self.target
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, "a") as fh:
+                fh.write(json.dumps(payload) + "\n")
+
+
+class Tracer:
+    def __init__(self, sample_rate: float = 0.0, export_target: str = "file:./data/traces.jsonl"):
+        self.sample_rate = sample_rate
+        self.export_target = export_target
+        self._exporter: Optional[_Exporter] = None
+        self._current: contextvars.ContextVar = contextvars.ContextVar("helios_current_span", default=None)
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        return cls(
+            sample_rate=float(os.getenv("HELIOS_TRACE_SAMPLE_RATE", 0)),
+            export_target=os.getenv("HELIOS_TRACE_EXPORT", "file:./data/traces.jsonl"),
+        )
+
+    def current_span(self) -> Optional[Span]:
+        return self._current.get()
+
+    def _export(self, trace: Trace) -> None:
+        if self._exporter is None:
+            self._exporter = _Exporter(self.export_target)
+        self._exporter.submit(list(trace.spans))
+
+    @contextmanager
+    def root_span(self, name: str, force: bool = False, links: Optional[List[Span]] = None, **attributes: Any):
+        """Start a trace for one request if it is sampled (or forced); yields the span or None.
+        `links` are spans in other traces this one follows from (exported as OTLP links)."""
+        if not force and (self.sample_rate <= 0 or random.random() >= self.sample_rate):
+            yield None
+            return
+        trace = Trace()
+        try:
+            with self._open(name, trace, None, attributes, links) as span:
+                yield span
+        finally:
+            self._export(trace)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any):
+        """Child span of the current trace; a no-op outside sampled requests"""
+        parent = self._current.get()
+        if parent is None:
+            yield None
+            return
+        with self._open(name, parent.trace, parent.span_id, attributes) as span:
+            yield span
+
+    @contextmanager
+    def _open(self, name: str, trace: Trace, parent_id: Optional[str], attributes: Dict[str, Any],
+              links: Optional[List[Span]] = None):
+        span = Span(name, trace, parent_id, attributes, links)
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self._current.reset(token)
+            span.end_ns = time.time_ns()
+            trace.spans.append(span)
+
+    def record(self, name: str, start_ns: int, end_ns: int, **attributes: Any) -> None:
+        """Record an already-finished child span (used by SQLAlchemy cursor hooks)"""
+        parent = self._current.get()
+        if parent is None:
+            return
+        span = Span(name, parent.trace, parent.span_id, attributes)
+        span.start_ns = start_ns
+        span.end_ns = end_ns
+        parent.trace.spans.append(span)
+
+
+tracer = Tracer.from_env()
+
+
+def instrument_engine(engine) -> None:
+    """Emit a span per SQL statement executed inside a sampled trace"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if tracer.current_span() is not None:
+            conn.info.setdefault("helios_trace_start", []).append(time.time_ns())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("helios_trace_start")
+        if starts:
+            tracer.record("sql", starts.pop(), time.time_ns(), **{"db.statement": statement[:500]})
@@ -0,0 +1,325 @@
+"""
+Event-driven rescoring for Helios Risk Oracle
+Tails the fullnode's transaction stream (`/transactions?start=<ledger version>`) with a single
+persisted ledger-version cursor, picks out events emitted by the StrataFi modules that change
+risk inputs, and enqueues only the affected vaults for rescoring. The cost of a poll depends
+on chain throughput, not on the number of vaults. Repeated events for the same vault inside
+the debounce window collapse into one rescore.
+
+A fresh deployment (no stored cursor) starts at the current ledger head, so history is
+never replayed into rescores. If the node has pruned the stored version, tailing resumes
+from the head.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+from db import get_session, EventCursorModel, VaultRegistryModel
+from endpoints import get_fullnode_pool
+from ratelimit import request_priority, PRIORITY_BACKGROUND
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Event structs whose emission changes risk inputs. ScoreUpdateEvent is deliberately
+# absent: those are our own publications.
+WATCHED_EVENTS: Tuple[str, ...] = (
+    "vault::VaultCreatedEvent",
+    "vault::RWAAddedEvent",
+    "tranche::MintEvent",
+    "tranche::InvestEvent",
+    "waterfall::PaymentProcessedEvent",
+    "waterfall::StateInitializedEvent",
+    "risk_oracle::OracleInitEvent",
+)
+
+# agent_event_cursors row holding the ledger version cursor
+CURSOR_HANDLE = "transactions"
+CURSOR_FIELD = "ledger_version"
+
+ZERO_ADDRESSES = {"0x0", "0x" + "0" * 64}
+
+RescoreCallback = Callable[[int, str], Awaitable[Any]]
+
+
+class RescoreQueue:
+    """Debounced, de-duplicated set of vaults waiting to be rescored"""
+
+    def __init__(self, debounce_seconds: float = 2.0):
+        self.debounce_seconds = debounce_seconds
+        self._pending: Dict[int, Tuple[str, float]] = {}  # vault_id -> (owner, due)
+        self._wakeup = asyncio.Event()
+        self.enqueued_total = 0
+        self.deduplicated_total = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def enqueue(self, vault_id: int, owner_address: str) -> bool:
+        """Schedule a rescore; returns False if one is already pending for this vault"""
+        if vault_id in self._pending:
+            # Keep the original deadline so a stream of events cannot starve the vault
+            _, due = self._pending[vault_id]
+            self._pending[vault_id] = (owner_address, due)
+            self.deduplicated_total += 1
+            return False
+        self._pending[vault_id] = (owner_address, time.monotonic() + self.debounce_seconds)
+        self.enqueued_total += 1
+        self._wakeup.set()
+        return True
+
+    async def next_batch(self) -> List[Tuple[int, str]]:
+        """Wait until at least one vault is due, then return every due vault"""
+        while True:
+            now = time.monotonic()
+            due = [vid for vid, (_, at) in self._pending.items() if at <= now]
+            if due:
+                return [(vid, self._pending.pop(vid)[0]) for vid in due]
+            self._wakeup.clear()
+            timeout = None
+            if self._pending:
+                timeout = min(at for _, at in self._pending.values()) - now
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+class EventTriggerPipeline:
+    """Tails the transaction stream for StrataFi events and drives a RescoreQueue"""
+
+    def __init__(
+        self,
+        rescore: RescoreCallback,
+        module_address: Optional[str] = None,
+        poll_seconds: float = 2.0,
+        debounce_seconds: float = 2.0,
+        max_concurrent_rescores: int = 4,
+        page_size: int = 100,
+        max_pages: int = 20,
+    ):
+        self.rescore = rescore
+        self.module_address = (module_address or os.getenv(
+            "STRATAFI_ADDR", "0x1234567890abcdef1234567890abcdef1234567890abcdef1234567890abcdef"
+        )).lower()
+        self.poll_seconds = poll_seconds
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.event_types = {f"{self.module_address}::{name}" for name in WATCHED_EVENTS}
+        self.queue = RescoreQueue(debounce_seconds)
+        self.fullnode_pool = get_fullnode_pool()
+        # Vaults at these accounts are rescored even before they are in agent_vaults
+        self.extra_addresses = {
+            a.strip().lower() for a in os.getenv("HELIOS_WATCH_ADDRESSES", "").split(",") if a.strip()
+        }
+        self._semaphore = asyncio.Semaphore(max_concurrent_rescores)
+        self.next_version: Optional[int] = None
+        self._tasks: List[asyncio.Task] = []
+        self._running: Set[asyncio.Task] = set()
+        self.events_seen_total = 0
+        self.events_ignored_total = 0
+
+    @classmethod
+    def from_env(cls, rescore: RescoreCallback) -> "EventTriggerPipeline":
+        return cls(
+            rescore,
+            poll_seconds=float(os.getenv("HELIOS_EVENT_POLL_SECONDS", 2)),
+            debounce_seconds=float(os.getenv("HELIOS_RESCORE_DEBOUNCE_SECONDS", 2)),
+            max_concurrent_rescores=int(os.getenv("HELIOS_RESCORE_CONCURRENCY", 4)),
+            max_pages=int(os.getenv("HELIOS_EVENT_MAX_PAGES", 20)),
+        )
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._tail_loop()), loop.create_task(self._rescore_loop())]
+        logger.info("Event trigger pipeline started")
+
+    async def stop(self) -> None:
+        tasks = self._tasks + list(self._running)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._running.clear()
+
+    # ---- persistence (called via asyncio.to_thread) ----
+
+    def _load_cursor(self) -> Optional[int]:
+        session = get_session()
+        try:
+            row = (
+                session.query(EventCursorModel)
+                .filter(
+                    EventCursorModel.account_address == self.module_address,
+                    EventCursorModel.event_handle == CURSOR_HANDLE,
+                    EventCursorModel.field_name == CURSOR_FIELD,
+                )
+                .first()
+            )
+            return row.next_sequence if row else None
+        finally:
+            session.close()
+
+    def _save_cursor(self, version: int) -> None:
+        session = get_session()
+        try:
+            row = (
+                session.query(EventCursorModel)
+                .filter(
+                    EventCursorModel.account_address == self.module_address,
+                    EventCursorModel.event_handle == CURSOR_HANDLE,
+                    EventCursorModel.field_name == CURSOR_FIELD,
+                )
+                .first()
+            )
+            if row is None:
+                session.add(EventCursorModel(
+                    account_address=self.module_address, event_handle=CURSOR_HANDLE,
+                    field_name=CURSOR_FIELD, next_sequence=version, updated_at=datetime.utcnow(),
+                ))
+            else:
+                row.next_sequence = version
+                row.updated_at = datetime.utcnow()
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"Could not persist event cursor: {e}")
+        finally:
+            session.close()
+
+    @staticmethod
+    def _lookup_owners(vault_ids: Iterable[int]) -> Dict[int, str]:
+        """Registered owner of each vault (only registered vaults are rescored)"""
+        vault_ids = list(vault_ids)
+        if not vault_ids:
+            return {}
+        session = get_session()
+        try:
+            rows = (
+                session.query(VaultRegistryModel.vault_id, VaultRegistryModel.owner_address)
+                .filter(VaultRegistryModel.vault_id.in_(vault_ids))
+                .all()
+            )
+            return {int(vault_id): owner for vault_id, owner in rows}
+        finally:
+            session.close()
+
+    # ---- tailing ----
+
+    async def _ledger_head(self) -> int:
+        info = await self.fullnode_pool.get("/")
+        return int(info["ledger_version"])
+
+    def extract_events(self, transactions: List[Dict]) -> Dict[int, Optional[str]]:
+        """vault_id -> the account that emitted the event (None if unknown) for watched events"""
+        found: Dict[int, Optional[str]] = {}
+        for txn in transactions:
+            for event in txn.get("events") or []:
+                address, _, name = str(event.get("type", "")).split("<", 1)[0].partition("::")
+                if f"{address.lower()}::{name}" not in self.event_types:
+                    continue
+                self.events_seen_total += 1
+                data = event.get("data") or {}
+                # VaultCreatedEvent carries `id` (and `owner`); every other event `vault_id`
+                raw_id = data.get("vault_id", data.get("id"))
+                try:
+                    vault_id = int(raw_id)
+                except (TypeError, ValueError):
+                    self.events_ignored_total += 1
+                    continue
+                account = data.get("owner") or (event.get("guid") or {}).get("account_address")
+                account = str(account).lower() if account and str(account).lower() not in ZERO_ADDRESSES else None
+                found[vault_id] = account or found.get(vault_id)
+        return found
+
+    async def _enqueue(self, found: Dict[int, Optional[str]]) -> int:
+        owners = await asyncio.to_thread(self._lookup_owners, found.keys())
+        enqueued = 0
+        for vault_id, account in found.items():
+            owner = owners.get(vault_id)
+            if owner is None and account in self.extra_addresses:
+                owner = account
+            if owner is None:
+                self.events_ignored_total += 1
+                continue
+            if self.queue.enqueue(vault_id, owner):
+                enqueued += 1
+        return enqueued
+
+    async def poll_once(self) -> int:
+        """Read transactions since the cursor; returns the number of vaults enqueued"""
+        with request_priority(PRIORITY_BACKGROUND):
+            if self.next_version is None:
+                stored = await asyncio.to_thread(self._load_cursor)
+                if stored is None:
+                    stored = await self._ledger_head() + 1
+                    await asyncio.to_thread(self._save_cursor, stored)
+                    logger.info(f"Event tailing starts at ledger version {stored}")
+                self.next_version = stored
+
+            start = self.next_version
+            enqueued = 0
+            for _ in range(self.max_pages):
+                try:
+                    transactions = await self.fullnode_pool.get(
+                        "/transactions", params={"start": self.next_version, "limit": self.page_size}
+                    )
+                except Exception as e:
+                    response = getattr(e, "response", None)
+                    if response is not None and response.status_code in (404, 410):
+                        # Version pruned on the node: skip ahead rather than stall
+                        head = await self._ledger_head() + 1
+                        logger.warning(f"Ledger version {self.next_version} unavailable, resuming at {head}")
+                        self.next_version = head
+                        break
+                    raise
+                if not transactions:
+                    break
+                enqueued += await self._enqueue(self.extract_events(transactions))
+                self.next_version = int(transactions[-1]["version"]) + 1
+                if len(transactions) < self.page_size:
+                    break
+            else:
+                logger.info(f"Event tailing is behind; resuming at ledger version {self.next_version}")
+
+        if self.next_version != start:
+            await asyncio.to_thread(self._save_cursor, self.next_version)
+        return enqueued
+
+    async def _tail_loop(self) -> None:
+        while True:
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Event tail cycle failed: {e}")
+            await asyncio.sleep(self.poll_seconds)
+
+    async def _rescore_one(self, vault_id: int, owner_address: str) -> None:
+        async with self._semaphore:
+            try:
+                with request_priority(PRIORITY_BACKGROUND):
+                    await self.rescore(vault_id, owner_address)
+            except Exception as e:
+                logger.error(f"Event-triggered rescore of vault {vault_id} failed: {e}")
+
+    async def _rescore_loop(self) -> None:
+        while True:
+            batch = await self.queue.next_batch()
+            logger.info(f"Rescoring {len(batch)} vault(s) after on-chain events")
+            for vault_id, owner_address in batch:
+                task = asyncio.get_running_loop().create_task(self._rescore_one(vault_id, owner_address))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)